@@ -7,25 +7,25 @@ Measures performance metrics and provides optimization recommendations.
 import time
 import psutil
 import sys
-import os
 from pathlib import Path
 import tempfile
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict
 import json
 import shutil
 import numpy as np
 import argparse
 
+# Resolved once so the benchmark finds its files from any working directory
+PROJECT_ROOT = Path(__file__).resolve().parent
+
 # Add project root to path
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(PROJECT_ROOT))
 
-from transcription.transcribe import AudioTranscriber
-from transcription.text_formatter import TextFormatter, format_transcript
+from transcription.text_formatter import TextFormatter
 from core.utils import create_markdown
 from core.model_manager import ModelManager
 from transcription.batch_processor import BatchTranscriber
-from realtime.realtime_transcriber import RealtimeTranscriber
 
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
@@ -37,12 +37,12 @@ class PerformanceBenchmark:
         self.results = {}
         self.system_info = self._get_system_info()
         self.baseline = self._load_baseline(baseline_file) if baseline_file else None
-        self.test_audio_path = Path("benchmark_test.wav")
+        self.test_audio_path = PROJECT_ROOT / "benchmark_test.wav"
         
         # Ensure test audio exists
         if not self.test_audio_path.exists():
             print("⚠️ Test audio not found. Generating...")
-            import generate_test_audio
+            from scripts import generate_test_audio
             generate_test_audio.generate_sine_wave(str(self.test_audio_path))
     
     def _get_system_info(self) -> Dict:
@@ -276,7 +276,6 @@ class PerformanceBenchmark:
         
         # Test buffer performance
         from collections import deque
-        import numpy as np
         
         buffer_size = 16000 * 30 # 30 seconds
         audio_buffer = deque(maxlen=buffer_size)
@@ -366,12 +365,15 @@ class PerformanceBenchmark:
         print(f"  Total Overhead: {self.results['memory_usage']['total_memory_mb']:.1f} MB")
         
     
-    def save_results(self, filename: str = "benchmark_results.json"):
-        """Save benchmark results to JSON file."""
+    def save_results(self, filename: str = None):
+        """Save benchmark results to JSON file (benchmark_results.json in the project root by default)."""
         if not self.results:
             print("No benchmark results to save.")
             return
         
+        if filename is None:
+            filename = PROJECT_ROOT / "benchmark_results.json"
+        
         with open(filename, 'w') as f:
             json.dump(self.results, f, indent=2)
         
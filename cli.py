@@ -9,7 +9,6 @@ import argparse
 import logging
 import time
 from pathlib import Path
-from typing import Optional
 from transcription.transcribe import AudioTranscriber
 from core.config import WHISPER_MODEL, SUPPORTED_LANGUAGES
 
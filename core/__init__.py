@@ -5,11 +5,20 @@ Provides foundational components including configuration management,
 model management, utilities, and settings.
 """
 
-from core.model_manager import ModelManager
 from core.config import get_config
 from core.utils import create_markdown, create_realtime_note
 from core.settings_manager import SettingsManager
 
+
+def __getattr__(name):
+    # ModelManager pulls in faster-whisper/CTranslate2; import it on first use
+    # so importing lightweight helpers (e.g. from batch worker processes) stays cheap.
+    if name == 'ModelManager':
+        from core.model_manager import ModelManager
+        return ModelManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     'ModelManager',
     'get_config',
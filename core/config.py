@@ -34,7 +34,7 @@ class ModelConfig:
             logger.warning(f"Invalid model name '{self.name}'. Defaulting to 'medium'.")
             self.name = "medium"
         
-        valid_compute_types = {'float16', 'int8_float16', 'int8', 'float32'}
+        valid_compute_types = {'auto', 'float16', 'int8_float16', 'int8', 'float32'}
         if self.compute_type not in valid_compute_types:
             logger.warning(f"Invalid compute_type '{self.compute_type}'. Defaulting to 'int8'.")
             self.compute_type = "int8"
@@ -300,13 +300,33 @@ def get_config_manager() -> ConfigManager:
     return _config_manager
 
 
+def cuda_selected(device: str) -> bool:
+    """True when a model on `device` runs on CUDA; 'auto' picks CUDA when CTranslate2 sees a device."""
+    if device != "auto":
+        return device == "cuda"
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def resolve_compute_type(compute_type: str, device: str) -> str:
+    """Resolve compute_type 'auto' to int8 on CPU and int8_float16 on CUDA; others pass through."""
+    if compute_type != "auto":
+        return compute_type
+    return "int8_float16" if cuda_selected(device) else "int8"
+
+
 # ============================================================================
 # Exported Configuration Constants (Backward Compatible)
 # ============================================================================
 
 # Whisper model configuration
 WHISPER_MODEL = _config_manager.model.name
-ENABLE_INT8_QUANTIZATION = _config_manager.model.compute_type == "int8"
+ENABLE_INT8_QUANTIZATION = resolve_compute_type(
+    _config_manager.model.compute_type, _config_manager.model.device
+) == "int8"
 
 # Directory Configuration
 TRANSCRIPTION_FOLDER = Path(_config_manager.runtime.transcription_folder)
@@ -316,10 +336,10 @@ RECORDINGS_FOLDER = Path(_config_manager.runtime.recordings_folder)
 OBSIDIAN_VAULT_PATH = TRANSCRIPTION_FOLDER  # Deprecated: use TRANSCRIPTION_FOLDER instead
 
 # Supported audio formats
-SUPPORTED_FORMATS = {
+SUPPORTED_FORMATS = frozenset({
     '.mp3', '.wav', '.m4a', '.flac', 
     '.mp4', '.ogg', '.aac', '.wma'
-}
+})
 
 # Whisper model information
 WHISPER_MODELS = {
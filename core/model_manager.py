@@ -2,7 +2,7 @@ import logging
 from typing import Optional, Dict, Any, Tuple, Iterator
 from faster_whisper import WhisperModel
 from faster_whisper.transcribe import TranscriptionInfo, Segment
-from core.config import get_config_manager
+from core.config import get_config_manager, cuda_selected, resolve_compute_type
 from transcription.quality_metrics import QualityMetricsCalculator
 import numpy as np
 import time
@@ -38,6 +38,7 @@ class ModelManager:
     """
     _instance = None
     _model = None
+    _batched_pipeline = None
 
     # Performance-optimized default parameters with dynamic tuning
     DEFAULT_PARAMS = {
@@ -77,21 +78,38 @@ class ModelManager:
         # Get configuration
         config = get_config_manager()
         self.model_size = config.model.name
-        self.compute_type = config.model.compute_type
         
         # Device selection
         device_setting = config.model.device
         self.device = "auto" if device_setting == "auto" else device_setting
+        self.on_cuda = self._uses_cuda()
+        self.compute_type = self._resolve_compute_type(config.model.compute_type)
+        self.device_index = self._resolve_device_index(config.get('model.device_index', 0))
         
         # Quality mode configuration
         self.quality_mode = config.get('model.quality_mode', 'high')  # high|balanced|fast
         self.enable_vad = config.get('model.enable_vad', True)
+        # Silence removed by VAD is never sent to the encoder
+        self.vad_parameters = {
+            **self.VAD_PARAMS,
+            "threshold": config.get('model.vad_threshold', self.VAD_PARAMS["threshold"]),
+            "min_silence_duration_ms": config.get(
+                'model.vad_min_silence_ms', self.VAD_PARAMS["min_silence_duration_ms"]
+            ),
+        }
         self.enable_retry = config.get('model.enable_retry', True)
         self.max_retries = config.get('model.max_retries', 2)
         
         # Adaptive VAD: dynamically adjust threshold based on audio characteristics
         self.adaptive_vad = config.get('model.adaptive_vad', False)
-        self.batch_size = config.get('model.batch_size', 1)  # Batch inference support
+        # Batched inference: above 1, VAD speech chunks are decoded this many at
+        # a time through faster-whisper's BatchedInferencePipeline
+        self.batch_size = config.get('model.batch_size', 1)
+        # Parallel CTranslate2 workers: lets concurrent transcribe() calls from
+        # multiple threads run in parallel on one loaded model
+        self.num_workers = config.get('model.num_workers', 1)
+        # CTranslate2 intra-op threads on CPU (0 = CTranslate2's default)
+        self.cpu_threads = config.get('model.cpu_threads', 0)
         
         # Performance optimizations
         self.enable_model_warmup = config.get('model.enable_warmup', True)
@@ -108,6 +126,44 @@ class ModelManager:
                    f"Quality={self.quality_mode}, VAD={self.enable_vad}, AdaptiveVAD={self.adaptive_vad}, "
                    f"Warmup={self.enable_model_warmup}, DynamicBeam={self.enable_dynamic_beam}")
 
+    def _uses_cuda(self) -> bool:
+        """True when the model runs on CUDA; 'auto' picks CUDA when a device is visible."""
+        return cuda_selected(self.device)
+
+    def _resolve_compute_type(self, compute_type: str) -> str:
+        """
+        Resolve 'auto' to the quantization for the target device.
+        
+        int8 on CPU; int8_float16 on CUDA (int8 weights, fp16 activations),
+        which cuts weight traffic without the int8 activation overhead on GPU.
+        """
+        if compute_type != "auto":
+            return compute_type
+        
+        resolved = resolve_compute_type(compute_type, self.device)
+        logger.info(f"Resolved compute_type 'auto' to '{resolved}'")
+        return resolved
+
+    def _resolve_device_index(self, device_index):
+        """
+        Resolve 'all' to every visible CUDA device (a list loads one model
+        replica per GPU); anything else is passed to faster-whisper as-is.
+        """
+        if device_index != "all":
+            return device_index
+        try:
+            import ctranslate2
+            count = ctranslate2.get_cuda_device_count()
+        except Exception:
+            count = 0
+        return list(range(count)) if count > 1 else 0
+
+    @property
+    def parallel_decoders(self) -> int:
+        """Transcriptions the loaded model can run at once: workers per device times devices."""
+        devices = len(self.device_index) if isinstance(self.device_index, (list, tuple)) else 1
+        return max(1, self.num_workers) * devices
+
     def _configure_quality_mode(self):
         """Configure parameters based on quality mode."""
         if self.quality_mode == "high":
@@ -145,7 +201,10 @@ class ModelManager:
                 self._model = WhisperModel(
                     model_name,
                     device=self.device,
+                    device_index=self.device_index,
                     compute_type=self.compute_type,
+                    num_workers=self.num_workers,
+                    cpu_threads=self.cpu_threads,
                     download_root=None,
                     local_files_only=False
                 )
@@ -169,10 +228,11 @@ class ModelManager:
             dummy_audio = np.zeros(16000, dtype=np.float32)
             start_time = time.time()
             
-            # Run a quick warmup inference
+            # Run a quick warmup inference at the production beam width so the
+            # decoder's beam buffers are allocated before the first real file
             segments, _ = self._model.transcribe(
                 dummy_audio,
-                beam_size=1,
+                beam_size=self.default_beam_size,
                 language=None,
                 task="transcribe",
                 vad_filter=False
@@ -185,6 +245,21 @@ class ModelManager:
         except Exception as e:
             logger.warning(f"Model warmup failed (non-critical): {e}")
 
+    def _get_batched_pipeline(self):
+        """
+        Return a BatchedInferencePipeline over the loaded model, or None when
+        the installed faster-whisper predates it (< 1.1).
+        """
+        if self._batched_pipeline is None:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+            except ImportError:
+                logger.warning("faster-whisper has no BatchedInferencePipeline; using sequential decoding")
+                self.batch_size = 1
+                return None
+            self._batched_pipeline = BatchedInferencePipeline(model=self.load_model())
+        return self._batched_pipeline
+
     def transcribe(
         self,
         audio,
@@ -215,6 +290,15 @@ class ModelManager:
         # Merge default quality parameters with user overrides (pass audio for optimization)
         params = self._build_transcription_params(language, task, audio=audio, **kwargs)
         
+        if self.batch_size > 1:
+            pipeline = self._get_batched_pipeline()
+            if pipeline is not None:
+                # The pipeline batches the VAD speech chunks, so VAD stays on
+                model = pipeline
+                params["batch_size"] = self.batch_size
+                params["vad_filter"] = True
+                params.setdefault("vad_parameters", self.vad_parameters.copy())
+        
         # Attempt transcription with retry mechanism
         if self.enable_retry:
             return self._transcribe_with_retry(model, audio, params)
@@ -266,7 +350,7 @@ class ModelManager:
         
         # Add VAD parameters if enabled (with adaptive tuning)
         if params["vad_filter"]:
-            vad_params = self.VAD_PARAMS.copy()
+            vad_params = self.vad_parameters.copy()
             if self.adaptive_vad and audio is not None:
                 vad_params = self._optimize_vad_params(audio, vad_params)
             params["vad_parameters"] = kwargs.pop("vad_parameters", vad_params)
@@ -361,7 +445,9 @@ class ModelManager:
                     params["beam_size"] = 1
                     params["best_of"] = 1
                     params["temperature"] = [0.0]
-                    params["vad_filter"] = False  # Disable VAD to be more permissive
+                    if "batch_size" not in params:
+                        # Disable VAD to be more permissive (batched decoding needs it)
+                        params["vad_filter"] = False
                     logger.warning(f"Retry {attempt}: Using fast fallback parameters")
                 
                 segments, info = model.transcribe(audio, **params)
@@ -418,13 +504,12 @@ class ModelManager:
         metrics = self.quality_metrics_calculator.calculate_metrics(segment_dicts)
         
         # Return backward-compatible format
-        confidences = [seg.avg_logprob for seg in segments if hasattr(seg, 'avg_logprob')]
         return {
             "avg_confidence": metrics['confidence_simple_avg'],
-            "low_confidence_count": sum(1 for c in confidences if c < -0.5),
+            "low_confidence_count": metrics['low_confidence_count'],
             "total_segments": metrics['segment_count'],
-            "min_confidence": min(confidences) if confidences else 0.0,
-            "max_confidence": max(confidences) if confidences else 0.0,
+            "min_confidence": metrics['confidence_min'],
+            "max_confidence": metrics['confidence_max'],
             "quality_tier": metrics['quality_tier'],
             "degradation_detected": metrics['degradation_detected']
         }
@@ -4,10 +4,19 @@ Handles markdown creation and text formatting
 """
 from datetime import datetime
 import logging
+from operator import itemgetter
+import re
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import rather than looked up in re's cache on every call
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_INVALID_FNAME_RE = re.compile(r'[<>:"/\\|?*]')
+
+_SEGMENT_FIELDS = itemgetter('start', 'end', 'text')
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 def format_text(text: str, style: str = "auto") -> str:
     """
@@ -39,10 +48,8 @@ def format_text(text: str, style: str = "auto") -> str:
 
 def split_into_sentences(text: str) -> List[str]:
     """Split text into sentences using regex"""
-    import re
     # Split on sentence endings followed by space
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    return [s.strip() for s in sentences if s.strip()]
+    return [s for s in (s.strip() for s in _SENTENCE_SPLIT_RE.split(text)) if s]
 
 
 def group_sentences(sentences: List[str], group_size: int) -> str:
@@ -64,7 +71,9 @@ def smart_format(sentences: List[str]) -> str:
     current_length = 0
     
     for sentence in sentences:
-        sentence_length = len(sentence.split())
+        # Word estimate without materialising the words; transcripts are
+        # single-spaced and this only feeds the 150-word cutoff
+        sentence_length = sentence.count(' ') + 1
         
         # Start new paragraph if:
         # 1. Current paragraph has 3+ sentences, OR
@@ -94,9 +103,8 @@ def format_timestamp(seconds: float) -> str:
     Returns:
         Formatted timestamp string
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
+    hours, rem = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rem, 60)
     
     if hours > 0:
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
@@ -104,6 +112,20 @@ def format_timestamp(seconds: float) -> str:
         return f"{minutes:02d}:{secs:02d}"
 
 
+def _fmt_ts_short(seconds: int) -> str:
+    """MM:SS for whole seconds below one hour"""
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def _fmt_ts_long(seconds: int) -> str:
+    """format_timestamp for whole seconds"""
+    hours, rem = divmod(seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
 def create_timestamps_section(segments: List[Dict[str, Any]], max_segments: int = 20) -> str:
     """
     Create a timestamps section from Whisper segments
@@ -118,21 +140,26 @@ def create_timestamps_section(segments: List[Dict[str, Any]], max_segments: int
     if not segments:
         return "_No timestamp data available_"
     
-    timestamp_lines = []
     total_segments = len(segments)
     segments_to_show = segments[:max_segments]
     
-    for segment in segments_to_show:
-        start = segment.get('start', 0)
-        end = segment.get('end', 0)
-        text = segment.get('text', '').strip()
-        
-        start_time = format_timestamp(start)
-        end_time = format_timestamp(end)
-        
-        timestamp_lines.append(f"**{start_time} - {end_time}:** {text}")
+    # Whisper segments always carry these keys; read them with one C call per
+    # segment and only fall back to defaults for hand-built segment dicts
+    try:
+        rows = [_SEGMENT_FIELDS(segment) for segment in segments_to_show]
+    except KeyError:
+        rows = [(segment.get('start', 0), segment.get('end', 0), segment.get('text', ''))
+                for segment in segments_to_show]
+    
+    # Pick the formatter once: segments end after they start, so if no
+    # segment ends past the hour every stamp is MM:SS
+    max_end = max(int(end) for _, end, _ in rows)
+    fmt = _fmt_ts_short if max_end < 3600 else _fmt_ts_long
     
-    result = '\n\n'.join(timestamp_lines)
+    result = '\n\n'.join(
+        f"**{fmt(int(start))} - {fmt(int(end))}:** {text.strip()}"
+        for start, end, text in rows
+    )
     
     # Add note if there are more segments
     if total_segments > max_segments:
@@ -142,73 +169,30 @@ def create_timestamps_section(segments: List[Dict[str, Any]], max_segments: int
     return result
 
 
-def create_markdown(
+def _markdown_head(
     filename: str,
-    text: str,
     date: str,
     duration: str,
+    frontmatter_seconds: Any,
+    duration_seconds: float,
     file_size_mb: float,
     model: str,
     language: str,
-    formatting_style: str = "auto",
-    processing_time_seconds: float = 0,
-    duration_seconds: float = 0,
-    segments: List[Dict[str, Any]] = None,
-    **kwargs  # Accept additional kwargs and ignore them
+    formatting_style: str
 ) -> str:
-    """
-    Create a formatted markdown document from transcription data with Obsidian-style frontmatter
-    
-    Args:
-        filename: Name of the audio file (without extension)
-        text: Transcribed text
-        date: Transcription date/time
-        duration: Audio duration (formatted)
-        file_size_mb: File size in MB
-        model: Whisper model used
-        language: Detected language
-        formatting_style: Text formatting style
-        processing_time_seconds: Time taken to process
-        duration_seconds: Duration in seconds
-        segments: Whisper segments for timestamps
-        **kwargs: Additional parameters (ignored for compatibility)
-        
-    Returns:
-        Formatted markdown content with frontmatter
-    """
-    try:
-        # Format the transcription text
-        formatted_text = format_text(text, formatting_style)
-        
-        # Create timestamps section if segments available
-        timestamps_section = ""
-        if segments:
-            timestamps_section = f"""## 🕐 Timestamps
-
-{create_timestamps_section(segments)}
-
-"""
-        
-        # Get current datetime
-        now = datetime.now()
-        created_date = now.strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create Obsidian-compatible frontmatter
-        frontmatter = f"""---
+    """Frontmatter, title and metadata of a transcription note, up to the transcript body"""
+    return f"""---
 title: {filename}
-date: {created_date}
+date: {date}
 duration: {duration}
-duration_seconds: {duration_seconds}
+duration_seconds: {frontmatter_seconds}
 file_size: {file_size_mb:.1f} MB
 model: {model}
 language: {language}
 formatting: {formatting_style}
 tags: [transcription, audio-note, whisper]
-created: {created_date}
----"""
-        
-        # Create the full markdown document
-        markdown = f"""{frontmatter}
+created: {date}
+---
 
 # 🎤 Transcription: {filename}
 
@@ -218,126 +202,14 @@ created: {created_date}
 - **Model:** {model}
 - **Language:** {language}
 - **Formatting:** {formatting_style.capitalize()}
-- **Transcribed:** {created_date}
+- **Transcribed:** {date}
 
 ## 📝 Transcript
 
-{formatted_text}
-
-{timestamps_section}
----
-*Transcribed using Insightron*  
-*Generated on {created_date}*
 """
-        
-        logger.info(f"Enhanced markdown created for: {filename}")
-        return markdown
-        
-    except Exception as e:
-        logger.error(f"Error creating markdown: {e}")
-        # Return basic markdown on error
-        return f"""---
-title: {filename}
-date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-tags: [transcription, error]
----
 
-# {filename}
-
-## Transcription
-
-{text}
-
----
 
-*Error creating full markdown: {e}*
-*Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
-"""
-
-
-def format_duration(seconds: float) -> str:
-    """
-    Format duration in seconds to human-readable format
-    
-    Args:
-        seconds: Duration in seconds
-        
-    Returns:
-        Formatted string (e.g., "2:34" or "1:23:45")
-    """
-    if seconds < 60:
-        return f"{int(seconds)}s"
-    elif seconds < 3600:
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes}:{secs:02d}"
-    else:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        return f"{hours}:{minutes:02d}:{secs:02d}"
-
-
-def sanitize_filename(filename: str) -> str:
-    """
-    Sanitize filename by removing invalid characters
-    
-    Args:
-        filename: Original filename
-        
-    Returns:
-        Sanitized filename safe for filesystem
-    """
-    import re
-    # Remove invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    # Replace spaces with underscores
-    filename = filename.replace(' ', '_')
-    # Limit length
-    if len(filename) > 200:
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    else:
-        return f"{minutes:02d}:{secs:02d}"
-
-
-def create_timestamps_section(segments: List[Dict[str, Any]], max_segments: int = 20) -> str:
-    """
-    Create a timestamps section from Whisper segments
-    
-    Args:
-        segments: List of segment dictionaries from Whisper
-        max_segments: Maximum number of segments to display
-        
-    Returns:
-        Formatted timestamps section
-    """
-    if not segments:
-        return "_No timestamp data available_"
-    
-    timestamp_lines = []
-    total_segments = len(segments)
-    segments_to_show = segments[:max_segments]
-    
-    for segment in segments_to_show:
-        start = segment.get('start', 0)
-        end = segment.get('end', 0)
-        text = segment.get('text', '').strip()
-        
-        start_time = format_timestamp(start)
-        end_time = format_timestamp(end)
-        
-        timestamp_lines.append(f"**{start_time} - {end_time}:** {text}")
-    
-    result = '\n\n'.join(timestamp_lines)
-    
-    # Add note if there are more segments
-    if total_segments > max_segments:
-        remaining = total_segments - max_segments
-        result += f"\n\n*... and {remaining} more segment{'s' if remaining > 1 else ''}*"
-    
-    return result
-
-
-def create_markdown(
+def markdown_parts(
     filename: str,
     text: str,
     date: str,
@@ -350,9 +222,12 @@ def create_markdown(
     duration_seconds: float = 0,
     segments: List[Dict[str, Any]] = None,
     **kwargs  # Accept additional kwargs and ignore them
-) -> str:
+) -> List[str]:
     """
-    Create a formatted markdown document from transcription data with Obsidian-style frontmatter
+    Build a transcription note as a list of string parts, in document order
+    
+    Joining the parts gives the create_markdown output; writers can encode them
+    one by one instead of first concatenating the whole document.
     
     Args:
         filename: Name of the audio file (without extension)
@@ -369,71 +244,37 @@ def create_markdown(
         **kwargs: Additional parameters (ignored for compatibility)
         
     Returns:
-        Formatted markdown content with frontmatter
+        Markdown parts; a single basic note if the full note could not be built
     """
     try:
         # Format the transcription text
         formatted_text = format_text(text, formatting_style)
         
-        # Create timestamps section if segments available
-        timestamps_section = ""
-        if segments:
-            timestamps_section = f"""## 🕐 Timestamps
-
-{create_timestamps_section(segments)}
-
-"""
+        created_date = datetime.now().strftime(_DATE_FORMAT)
         
-        # Get current datetime
-        now = datetime.now()
-        created_date = now.strftime("%Y-%m-%d %H:%M:%S")
+        parts = [
+            _markdown_head(filename, created_date, duration, duration_seconds, duration_seconds,
+                           file_size_mb, model, language, formatting_style),
+            formatted_text,
+            "\n\n",
+        ]
         
-        # Create Obsidian-compatible frontmatter
-        frontmatter = f"""---
-title: {filename}
-date: {created_date}
-duration: {duration}
-duration_seconds: {duration_seconds}
-file_size: {file_size_mb:.1f} MB
-model: {model}
-language: {language}
-formatting: {formatting_style}
-tags: [transcription, audio-note, whisper]
-created: {created_date}
----"""
+        # Create timestamps section if segments available
+        if segments:
+            parts += ["## 🕐 Timestamps\n\n", create_timestamps_section(segments), "\n\n"]
         
-        # Create the full markdown document
-        markdown = f"""{frontmatter}
-
-# 🎤 Transcription: {filename}
-
-## 📊 Metadata
-- **Duration:** {duration} ({duration_seconds:.1f} seconds)
-- **File Size:** {file_size_mb:.1f} MB
-- **Model:** {model}
-- **Language:** {language}
-- **Formatting:** {formatting_style.capitalize()}
-- **Transcribed:** {created_date}
-
-## 📝 Transcript
-
-{formatted_text}
-
-{timestamps_section}
----
-*Transcribed using Insightron*  
-*Generated on {created_date}*
-"""
+        parts.append(f"\n---\n*Transcribed using Insightron*  \n*Generated on {created_date}*\n")
         
         logger.info(f"Enhanced markdown created for: {filename}")
-        return markdown
+        return parts
         
     except Exception as e:
         logger.error(f"Error creating markdown: {e}")
         # Return basic markdown on error
-        return f"""---
+        err_ts = datetime.now().strftime(_DATE_FORMAT)
+        return [f"""---
 title: {filename}
-date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+date: {err_ts}
 tags: [transcription, error]
 ---
 
@@ -446,8 +287,39 @@ tags: [transcription, error]
 ---
 
 *Error creating full markdown: {e}*
-*Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}*
-"""
+*Generated on {err_ts}*
+"""]
+
+
+def create_markdown(
+    filename: str,
+    text: str,
+    date: str,
+    duration: str,
+    file_size_mb: float,
+    model: str,
+    language: str,
+    formatting_style: str = "auto",
+    processing_time_seconds: float = 0,
+    duration_seconds: float = 0,
+    segments: List[Dict[str, Any]] = None,
+    **kwargs  # Accept additional kwargs and ignore them
+) -> str:
+    """
+    Create a formatted markdown document from transcription data with Obsidian-style frontmatter
+    
+    Takes the same arguments as markdown_parts and returns its parts joined.
+    
+    Returns:
+        Formatted markdown content with frontmatter
+    """
+    return "".join(markdown_parts(
+        filename, text, date, duration, file_size_mb, model, language,
+        formatting_style=formatting_style,
+        processing_time_seconds=processing_time_seconds,
+        duration_seconds=duration_seconds,
+        segments=segments,
+    ))
 
 
 def format_duration(seconds: float) -> str:
@@ -469,6 +341,7 @@ def format_duration(seconds: float) -> str:
     else:
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
+        secs = int(seconds % 60)
         return f"{hours}:{minutes:02d}:{secs:02d}"
 
 
@@ -482,9 +355,8 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for filesystem
     """
-    import re
     # Remove invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
+    filename = _INVALID_FNAME_RE.sub('', filename)
     # Replace spaces with underscores
     filename = filename.replace(' ', '_')
     # Limit length
@@ -493,33 +365,6 @@ def sanitize_filename(filename: str) -> str:
     return filename
 
 
-# Example usage and testing
-if __name__ == "__main__":
-    # Test markdown creation with timestamps
-    test_segments = [
-        {'start': 0, 'end': 9, 'text': 'What happened is that she has been talking about the harsh disturbances and realizing'},
-        {'start': 9, 'end': 14, 'text': 'them through the perfect consciousness relieves it.'},
-        {'start': 14, 'end': 26, 'text': 'Well this clears the easier karma and outer karma whereas the more external karma gets'}
-    ]
-    
-    test_data = {
-        'filename': 'Recording',
-        'text': 'This is a test transcription. It has multiple sentences. This helps test formatting.',
-        'date': '2025-10-19 09:53:57',
-        'duration': '1:50',
-        'duration_seconds': 109.5,
-        'file_size_mb': 18.4,
-        'model': 'whisper',
-        'language': 'en',
-        'formatting_style': 'auto',
-        'processing_time_seconds': 45.3,
-        'segments': test_segments
-    }
-    
-    markdown = create_markdown(**test_data)
-    print(markdown)
-
-
 def create_realtime_note(
     filename: str,
     text: str,
@@ -541,50 +386,54 @@ def create_realtime_note(
         # Format the transcription text
         formatted_text = format_text(text, formatting_style)
         
+        parts = [
+            _markdown_head(filename, date, duration, f"{duration_seconds:.3f}", duration_seconds,
+                           file_size_mb, model, language, formatting_style),
+            formatted_text,
+            "\n\n",
+        ]
+        
         # Create timestamps section
-        timestamps_section = ""
         if segments:
-            timestamps_section = f"## 🕐 Timestamps\n\n{create_timestamps_section(segments, max_segments=1000)}"
-
-        # Create Obsidian-compatible frontmatter
-        frontmatter = f"""---
-title: {filename}
-date: {date}
-duration: {duration}
-duration_seconds: {duration_seconds:.3f}
-file_size: {file_size_mb:.1f} MB
-model: {model}
-language: {language}
-formatting: {formatting_style}
-tags: [transcription, audio-note, whisper]
-created: {date}
----"""
+            parts += ["## 🕐 Timestamps\n\n", create_timestamps_section(segments, max_segments=1000)]
         
-        # Create the full markdown document
-        markdown = f"""{frontmatter}
-
-# 🎤 Transcription: {filename}
-
-## 📊 Metadata
-- **Duration:** {duration} ({duration_seconds:.1f} seconds)
-- **File Size:** {file_size_mb:.1f} MB
-- **Model:** {model}
-- **Language:** {language}
-- **Formatting:** {formatting_style.capitalize()}
-- **Transcribed:** {date}
+        parts.append(
+            f"\n\n---\n*Transcribed using Insightron - Realtime Transcription*  \n*Generated on {date}*\n"
+        )
+        return "".join(parts)
+        
+    except Exception as e:
+        logger.error(f"Error creating realtime note: {e}")
+        return f"Error generating note: {e}"
 
-## 📝 Transcript
 
-{formatted_text}
+def _selftest() -> None:
+    """Print a sample note; run with `python core/utils.py`"""
+    # Test markdown creation with timestamps
+    test_segments = [
+        {'start': 0, 'end': 9, 'text': 'What happened is that she has been talking about the harsh disturbances and realizing'},
+        {'start': 9, 'end': 14, 'text': 'them through the perfect consciousness relieves it.'},
+        {'start': 14, 'end': 26, 'text': 'Well this clears the easier karma and outer karma whereas the more external karma gets'}
+    ]
+    
+    test_data = {
+        'filename': 'Recording',
+        'text': 'This is a test transcription. It has multiple sentences. This helps test formatting.',
+        'date': '2025-10-19 09:53:57',
+        'duration': '1:50',
+        'duration_seconds': 109.5,
+        'file_size_mb': 18.4,
+        'model': 'whisper',
+        'language': 'en',
+        'formatting_style': 'auto',
+        'processing_time_seconds': 45.3,
+        'segments': test_segments
+    }
+    
+    markdown = create_markdown(**test_data)
+    print(markdown)
 
-{timestamps_section}
 
----
-*Transcribed using Insightron - Realtime Transcription*  
-*Generated on {date}*
-"""
-        return markdown
-        
-    except Exception as e:
-        logger.error(f"Error creating realtime note: {e}")
-        return f"Error generating note: {e}"
\ No newline at end of file
+# Example usage and testing
+if __name__ == "__main__":
+    _selftest()
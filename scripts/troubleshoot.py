@@ -9,6 +9,8 @@ import sys
 import subprocess
 import platform
 import os
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
 def check_system_info():
     """Display system information"""
@@ -33,47 +35,59 @@ def check_pip():
         return False
 
 def check_package(package_name):
-    """Check if a package is installed"""
-    try:
-        __import__(package_name)
+    """Check if a package is installed (locates it without importing it)"""
+    if importlib.util.find_spec(package_name) is not None:
         print(f"✅ {package_name} is installed")
         return True
-    except ImportError:
-        print(f"❌ {package_name} is NOT installed")
-        return False
+    print(f"❌ {package_name} is NOT installed")
+    return False
 
-def install_package(package_name):
-    """Install a package"""
-    print(f"🔄 Installing {package_name}...")
+def test_import(import_code, timeout=60):
+    """
+    Run an import in a fresh interpreter, so a crash or hang in one
+    package cannot abort the rest of the diagnostic.
+    Returns None on success, otherwise the error message.
+    """
+    try:
+        result = subprocess.run([sys.executable, "-c", import_code],
+                                capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return f"timed out after {timeout}s"
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return lines[-1] if lines else f"exit code {result.returncode}"
+    return None
+
+def install_packages(package_names, upgrade=False):
+    """
+    Install packages with a single pip run, so pip starts up and resolves
+    dependencies once. Wheels are preferred over source builds.
+    """
+    names = ", ".join(package_names)
+    print(f"🔄 Installing {names}...")
+    command = [sys.executable, "-m", "pip", "install", "--prefer-binary"]
+    if upgrade:
+        command.append("--upgrade")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", package_name], 
-                      check=True, capture_output=True)
-        print(f"✅ {package_name} installed successfully")
+        subprocess.run(command + list(package_names), check=True, capture_output=True)
+        print(f"✅ {names} installed successfully")
         return True
     except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to install {package_name}: {e.stderr}")
+        print(f"❌ Failed to install {names}: {e.stderr}")
         return False
 
+def install_package(package_name):
+    """Install a package"""
+    return install_packages([package_name])
+
 def fix_common_issues():
     """Try to fix common installation issues"""
     print("\n🔧 Attempting to fix common issues...")
     
-    # Upgrade pip
-    print("1. Upgrading pip...")
-    try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", "pip"], 
-                      check=True, capture_output=True)
-        print("✅ pip upgraded")
-    except:
-        print("⚠️  Could not upgrade pip")
-    
-    # Install wheel
-    print("2. Installing wheel...")
-    install_package("wheel")
-    
-    # Install setuptools
-    print("3. Installing setuptools...")
-    install_package("setuptools")
+    # Upgrade pip and install/upgrade the build tools in one pip run
+    print("Upgrading pip, wheel and setuptools...")
+    if not install_packages(["pip", "wheel", "setuptools"], upgrade=True):
+        print("⚠️  Could not upgrade pip/wheel/setuptools")
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -132,6 +146,7 @@ def main():
     ]
     
     missing_packages = []
+    still_missing = set()
     
     for import_name, package_name in required_packages:
         if not check_package(import_name):
@@ -141,8 +156,13 @@ def main():
         print(f"\n❌ Missing packages: {', '.join([p[1] for p in missing_packages])}")
         print("\n🔄 Attempting to install missing packages...")
         
-        for import_name, package_name in missing_packages:
-            install_package(package_name)
+        install_packages([package_name for _, package_name in missing_packages])
+        
+        # Locate them again now pip has run; whatever is still absent would
+        # only fail its import probe, so it is reported without a probe
+        importlib.invalidate_caches()
+        still_missing = {import_name for import_name, _ in missing_packages
+                         if importlib.util.find_spec(import_name) is None}
     else:
         print("\n✅ All required packages are installed!")
     
@@ -163,12 +183,20 @@ def main():
         ("tkinter", "import tkinter")
     ]
     
-    for name, import_code in test_imports:
-        try:
-            exec(import_code)
+    # Each probe is its own interpreter, so a few can import side by side;
+    # capped because every probe loads its package into memory
+    probes = [(name, code) for name, code in test_imports if name not in still_missing]
+    workers = min(4, os.cpu_count() or 1, max(len(probes), 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = dict(zip((name for name, _ in probes),
+                          pool.map(test_import, [code for _, code in probes])))
+    
+    for name, _ in test_imports:
+        error = errors.get(name, "not installed")
+        if error is None:
             print(f"✅ {name} import successful")
-        except ImportError as e:
-            print(f"❌ {name} import failed: {e}")
+        else:
+            print(f"❌ {name} import failed: {error}")
     
     print("\n🎯 Recommendations:")
     print("-" * 20)
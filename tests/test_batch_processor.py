@@ -0,0 +1,434 @@
+"""
+Unit tests for BatchTranscriber scheduling logic.
+Uses a mocked AudioTranscriber so no model is loaded.
+"""
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from transcription.batch_processor import BatchTranscriber
+from transcription.batch_state_manager import BatchState
+
+
+def _make_transcriber(tmp_path):
+    """Mock transcriber that returns one segment echoing the file name."""
+    transcriber = MagicMock()
+
+    def transcribe_file(audio_file, formatting_style="auto", initial_prompt=None, **kwargs):
+        stem = Path(audio_file).stem
+        return tmp_path / f"{stem}.md", {
+            'duration': '0:01',
+            'language': 'en',
+            'processing_time_seconds': 0.1,
+            'segments': [{'start': 0.0, 'end': 1.0, 'text': f"tail of {stem}"}],
+        }
+
+    transcriber.transcribe_file.side_effect = transcribe_file
+    return transcriber
+
+
+def _make_state(tmp_path, files):
+    state = BatchState("test_batch", state_dir=tmp_path / ".batch_state")
+    for f in files:
+        state.add_file(f)
+    return state
+
+
+@pytest.mark.batch
+def test_chain_context_passes_previous_tail(tmp_path):
+    """Files are processed in name order, each primed with the previous tail."""
+    files = [str(tmp_path / name) for name in ("part_2.wav", "part_1.wav", "part_3.wav")]
+    transcriber = _make_transcriber(tmp_path)
+
+    batch = BatchTranscriber(
+        model_size="tiny",
+        max_workers=4,
+        use_multiprocessing=True,
+        transcriber=transcriber,
+        chain_context=True,
+    )
+    assert batch.max_workers == 1
+    assert batch.use_multiprocessing is False
+
+    results = batch.transcribe_batch(files, batch_state=_make_state(tmp_path, files))
+
+    assert results['completed'] == 3
+    assert isinstance(results['successful'], list) and len(results['successful']) == 3
+    assert results['failed'] == []
+    assert results['successful'][0] == {
+        'file': str(tmp_path / "part_1.wav"),
+        'output': str(tmp_path / "part_1.md"),
+        'duration': '0:01',
+        'language': 'en',
+    }
+    prompts = [
+        (Path(c.args[0]).name, c.kwargs['initial_prompt'])
+        for c in transcriber.transcribe_file.call_args_list
+    ]
+    assert prompts == [
+        ("part_1.wav", None),
+        ("part_2.wav", "tail of part_1"),
+        ("part_3.wav", "tail of part_2"),
+    ]
+
+
+@pytest.mark.batch
+def test_chain_context_retries_failed_part_before_next(tmp_path):
+    """A failing middle part is retried in place, so later parts chain from the right tail."""
+    files = [str(tmp_path / f"part_{i}.wav") for i in (1, 2, 3, 4)]
+    transcriber = _make_transcriber(tmp_path)
+    transcriber.enable_audio_preprocessing = False
+    ok = transcriber.transcribe_file.side_effect
+    failures = {'part_2': 1, 'part_3': 3}
+
+    def transcribe_file(audio_file, **kwargs):
+        stem = Path(audio_file).stem
+        if failures.get(stem):
+            failures[stem] -= 1
+            raise RuntimeError("transient")
+        return ok(audio_file, **kwargs)
+
+    transcriber.transcribe_file.side_effect = transcribe_file
+    batch = BatchTranscriber(transcriber=transcriber, chain_context=True)
+    batch.retry_backoff_seconds = 0.05
+
+    results = batch.transcribe_batch(files, batch_state=_make_state(tmp_path, files), max_retries=2)
+
+    assert results['completed'] == 3
+    assert [record['file'] for record in results['failed']] == [files[2]]
+    prompts = [
+        (Path(c.args[0]).stem, c.kwargs['initial_prompt'])
+        for c in transcriber.transcribe_file.call_args_list
+    ]
+    assert prompts == [
+        ("part_1", None),
+        ("part_2", "tail of part_1"),
+        ("part_2", "tail of part_1"),
+        ("part_3", "tail of part_2"),
+        ("part_3", "tail of part_2"),
+        ("part_3", "tail of part_2"),
+        ("part_4", None),
+    ]
+
+
+@pytest.mark.batch
+def test_prefetcher_bounds_lookahead_by_bytes_and_loads_misses_inline():
+    import time
+    from types import SimpleNamespace
+    from transcription.batch_processor import AudioPrefetcher
+
+    loaded = []
+
+    def loader(path):
+        loaded.append(path)
+        return SimpleNamespace(path=path, nbytes=1)
+
+    def wait_for(count):
+        deadline = time.monotonic() + 2
+        while len(loaded) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+    prefetcher = AudioPrefetcher(loader, ["a", "b", "c", "d"], max_bytes=2, workers=1)
+    try:
+        # Two one-byte arrays fill the budget; decoding pauses until one is taken
+        wait_for(2)
+        assert loaded == ["a", "b"]
+        assert prefetcher.take("a").path == "a"
+        wait_for(3)
+        assert loaded == ["a", "b", "c"]
+        assert prefetcher.take("b").path == "b"
+        # Not in the upcoming list (e.g. a retry): decoded on demand
+        assert prefetcher.take("z").path == "z"
+        assert prefetcher.take("c").path == "c"
+    finally:
+        prefetcher.shutdown()
+    assert loaded.count("a") == 1 and loaded.count("b") == 1
+
+
+@pytest.mark.batch
+def test_prefetcher_skips_files_taken_before_their_prefetch_started():
+    """Takes that outrun the prefetcher decode each file once and strand nothing."""
+    import threading
+    import time
+    from types import SimpleNamespace
+    from concurrent.futures import ThreadPoolExecutor
+    from transcription.batch_processor import AudioPrefetcher
+
+    files = [f"f{i}" for i in range(8)]
+    loaded = []
+    lock = threading.Lock()
+
+    def loader(path):
+        with lock:
+            loaded.append(path)
+        # Slow enough that the four takers reach files not yet started
+        time.sleep(0.05)
+        return SimpleNamespace(path=path, nbytes=1024)
+
+    prefetcher = AudioPrefetcher(loader, files, workers=2)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            taken = list(pool.map(lambda f: prefetcher.take(f).path, files))
+        prefetcher._executor.shutdown(wait=True)
+        assert taken == files
+        assert sorted(loaded) == files
+        assert prefetcher._loaded == {} and prefetcher._held_bytes == 0
+    finally:
+        prefetcher.shutdown()
+
+
+@pytest.mark.batch
+def test_worker_reuses_process_transcriber(monkeypatch):
+    import transcription.batch_processor as bp
+
+    created = []
+
+    class FakeTranscriber:
+        def __init__(self, model_size, language):
+            created.append((model_size, language))
+
+        def transcribe_file(self, audio_file, formatting_style="auto"):
+            return Path(audio_file).with_suffix(".md"), {
+                'duration': '0:01',
+                'language': 'en',
+                'processing_time_seconds': 0.1,
+            }
+
+    monkeypatch.setattr(bp, "AudioTranscriber", FakeTranscriber)
+    monkeypatch.setattr(bp, "_WORKER_TRANSCRIBER", None)
+
+    bp._init_worker("tiny", "en")
+    first = bp.transcribe_single_file_worker("a.wav", "auto")
+    second = bp.transcribe_single_file_worker("b.wav", "auto")
+
+    assert created == [("tiny", "en")]
+    assert first['status'] == second['status'] == 'success'
+
+
+@pytest.mark.batch
+def test_worker_retries_failed_initialization(monkeypatch):
+    """A model load that failed in the initializer is retried by the next task."""
+    import transcription.batch_processor as bp
+
+    attempts = []
+
+    class FlakyTranscriber:
+        def __init__(self, model_size, language):
+            attempts.append((model_size, language))
+            if len(attempts) == 1:
+                raise RuntimeError("out of memory")
+
+        def transcribe_file(self, audio_file, formatting_style="auto"):
+            return Path(audio_file).with_suffix(".md"), {
+                'duration': '0:01',
+                'language': 'en',
+                'processing_time_seconds': 0.1,
+            }
+
+    monkeypatch.setattr(bp, "AudioTranscriber", FlakyTranscriber)
+    monkeypatch.setattr(bp, "_WORKER_TRANSCRIBER", None)
+    monkeypatch.setattr(bp, "_WORKER_ARGS", None)
+
+    bp._init_worker("tiny", "en")
+    assert bp._WORKER_TRANSCRIBER is None
+    result = bp.transcribe_single_file_worker("a.wav", "auto")
+
+    assert result['status'] == 'success'
+    assert attempts == [("tiny", "en"), ("tiny", "en")]
+
+
+@pytest.mark.batch
+def test_submit_window_bounds_in_flight_and_retries(tmp_path):
+    """Files flow through the bounded submit window and failures are re-queued."""
+    import threading
+
+    files = [str(tmp_path / f"f{i}.wav") for i in range(10)]
+    transcriber = _make_transcriber(tmp_path)
+    transcriber.enable_audio_preprocessing = False
+    ok = transcriber.transcribe_file.side_effect
+    lock = threading.Lock()
+    in_flight = {'now': 0, 'max': 0}
+    flaky = {'f3': 1}
+
+    def transcribe_file(audio_file, **kwargs):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        try:
+            stem = Path(audio_file).stem
+            if flaky.get(stem):
+                flaky[stem] -= 1
+                raise RuntimeError("transient")
+            return ok(audio_file, **kwargs)
+        finally:
+            with lock:
+                in_flight['now'] -= 1
+
+    transcriber.transcribe_file.side_effect = transcribe_file
+    batch = BatchTranscriber(max_workers=2, use_multiprocessing=False, transcriber=transcriber)
+    batch.retry_backoff_seconds = 0
+    submitted = []
+    original_submit = batch._submit
+
+    def tracking_submit(executor, audio_file, formatting_style):
+        submitted.append(audio_file)
+        return original_submit(executor, audio_file, formatting_style)
+
+    batch._submit = tracking_submit
+    results = batch.transcribe_batch(files, batch_state=_make_state(tmp_path, files))
+
+    assert results['completed'] == 10
+    assert results['failed'] == []
+    assert in_flight['max'] <= 2
+    assert submitted.count(str(tmp_path / "f3.wav")) == 2
+
+
+@pytest.mark.batch
+def test_retry_waits_for_backoff_without_stalling_other_files(tmp_path):
+    import time
+
+    files = [str(tmp_path / f"f{i}.wav") for i in range(4)]
+    transcriber = _make_transcriber(tmp_path)
+    transcriber.enable_audio_preprocessing = False
+    ok = transcriber.transcribe_file.side_effect
+    finished = []
+    failures = {'f0': 1}
+
+    def transcribe_file(audio_file, **kwargs):
+        stem = Path(audio_file).stem
+        if failures.get(stem):
+            failures[stem] -= 1
+            raise RuntimeError("transient")
+        finished.append((stem, time.monotonic()))
+        return ok(audio_file, **kwargs)
+
+    transcriber.transcribe_file.side_effect = transcribe_file
+    batch = BatchTranscriber(max_workers=1, use_multiprocessing=False, transcriber=transcriber)
+    batch.retry_backoff_seconds = 0.2
+
+    start = time.monotonic()
+    results = batch.transcribe_batch(files, batch_state=_make_state(tmp_path, files))
+
+    assert results['completed'] == 4
+    # Fresh files run while f0 backs off; the retry lands last, after the delay
+    assert [stem for stem, _ in finished] == ["f1", "f2", "f3", "f0"]
+    assert finished[-1][1] - start >= 0.2
+
+
+@pytest.mark.batch
+def test_process_pool_is_reused_until_settings_change(monkeypatch):
+    import transcription.batch_processor as bp
+
+    created = []
+
+    class FakePool:
+        def __init__(self, max_workers, initializer, initargs, mp_context=None):
+            created.append(initargs)
+            self.shut_down = False
+
+        def shutdown(self, wait=True):
+            self.shut_down = True
+
+    monkeypatch.setattr(bp, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(bp, "_PROCESS_POOL", None)
+    monkeypatch.setattr(bp, "_PROCESS_POOL_KEY", None)
+
+    first = bp._get_process_pool(2, "tiny", "en")
+    assert bp._get_process_pool(2, "tiny", "en") is first
+    second = bp._get_process_pool(2, "base", "en")
+
+    assert second is not first and first.shut_down
+    assert created == [("tiny", "en"), ("base", "en")]
+    bp.shutdown_process_pool()
+    assert second.shut_down and bp._PROCESS_POOL is None
+
+
+@pytest.mark.batch
+def test_pinned_pool_gives_each_worker_its_cores(monkeypatch):
+    """Pinned pools pass each worker a core set and a matching CTranslate2 thread count."""
+    import transcription.batch_processor as bp
+
+    created = []
+
+    class FakePool:
+        def __init__(self, max_workers, initializer, initargs, mp_context=None):
+            created.append(initargs)
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(bp, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(bp, "_PROCESS_POOL", None)
+    monkeypatch.setattr(bp, "_PROCESS_POOL_KEY", None)
+    monkeypatch.setattr(bp, "_cpu_core_sets", lambda workers: [{0, 1}, {2, 3}])
+
+    bp._get_process_pool(2, "tiny", "en", pin_cpus=True)
+    model_size, language, cpu_threads, core_queue = created[0]
+    assert (model_size, language, cpu_threads) == ("tiny", "en", 2)
+    assert [core_queue.get(timeout=1), core_queue.get(timeout=1)] == [{0, 1}, {2, 3}]
+    bp.shutdown_process_pool()
+
+
+@pytest.mark.batch
+def test_device_probe_runs_once_and_keeps_cpu_processes(monkeypatch):
+    """The ModelManager device probe is consulted once; only a CUDA model drops process mode."""
+    import sys
+    from types import SimpleNamespace
+
+    probes = []
+    on_cuda = {'value': False}
+
+    def model_manager():
+        probes.append(1)
+        return SimpleNamespace(on_cuda=on_cuda['value'])
+
+    monkeypatch.setitem(sys.modules, "core.model_manager", SimpleNamespace(ModelManager=model_manager))
+
+    batch = BatchTranscriber(use_multiprocessing=True, transcriber=MagicMock())
+    assert batch.use_multiprocessing is True
+    assert len(probes) == 1
+
+    on_cuda['value'] = True
+    batch = BatchTranscriber(use_multiprocessing=True, transcriber=MagicMock())
+    assert batch.use_multiprocessing is False
+    assert len(probes) == 2
+
+
+@pytest.mark.batch
+def test_pool_spawns_workers_that_apply_their_thread_count(monkeypatch):
+    """Workers start from a fresh interpreter, so the initializer's cpu_threads reaches a new ModelManager."""
+    import sys
+    from types import SimpleNamespace
+    import transcription.batch_processor as bp
+
+    pools = []
+
+    class FakePool:
+        def __init__(self, max_workers, initializer, initargs, mp_context=None):
+            pools.append(mp_context)
+
+        def shutdown(self, wait=True):
+            pass
+
+    monkeypatch.setattr(bp, "ProcessPoolExecutor", FakePool)
+    monkeypatch.setattr(bp, "_PROCESS_POOL", None)
+    monkeypatch.setattr(bp, "_PROCESS_POOL_KEY", None)
+    bp._get_process_pool(2, "tiny", "en")
+    assert pools[0].get_start_method() == "spawn"
+    bp.shutdown_process_pool()
+
+    # What the spawned worker's initializer does with its share of the cores
+    manager = SimpleNamespace(cpu_threads=0)
+    seen = []
+
+    class FakeTranscriber:
+        def __init__(self, model_size, language):
+            seen.append(manager.cpu_threads)
+
+    monkeypatch.setitem(sys.modules, "core.model_manager", SimpleNamespace(ModelManager=lambda: manager))
+    monkeypatch.setattr(bp, "AudioTranscriber", FakeTranscriber)
+    monkeypatch.setattr(bp, "_WORKER_TRANSCRIBER", None)
+    bp._init_worker("tiny", "en", cpu_threads=3)
+
+    assert seen == [3]
@@ -0,0 +1,127 @@
+"""
+Unit tests for BatchState persistence (event log + snapshots).
+"""
+import json
+import pytest
+
+from transcription import batch_state_manager
+from transcription.batch_state_manager import BatchState, FileStatus
+
+
+@pytest.mark.batch
+def test_state_is_rebuilt_from_event_log(tmp_path):
+    state = BatchState("b1", state_dir=tmp_path)
+    state.add_file("a.wav")
+    state.add_file("b.wav")
+    state.set_file_status("a.wav", FileStatus.SUCCESS, output_path="a.md")
+    state.set_file_status("b.wav", FileStatus.FAILED, last_error="boom")
+
+    # Only the log has been written; no snapshot yet
+    state.flush()
+    assert not state.state_file.exists()
+    assert len(state.log_file.read_text().splitlines()) == 4
+
+    resumed = BatchState("b1", state_dir=tmp_path)
+    assert resumed.state['files'] == state.state['files']
+    assert resumed.state['statistics'] == {'total': 2, 'completed': 1, 'failed': 1, 'skipped': 0}
+    assert resumed.get_pending_files() == ["b.wav"]
+
+
+@pytest.mark.batch
+def test_snapshot_compacts_log_and_replay_skips_applied_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_state_manager, "SNAPSHOT_INTERVAL", 3)
+    state = BatchState("b2", state_dir=tmp_path)
+    for name in ("a.wav", "b.wav", "c.wav"):
+        state.add_file(name)
+    state.flush()
+    assert json.loads(state.state_file.read_text())['seq'] == 3
+    # Events queued before the snapshot may land after truncation; all are stale
+    assert all(json.loads(line)['seq'] <= 3 for line in state.log_file.read_text().splitlines())
+
+    state.set_file_status("a.wav", FileStatus.SUCCESS)
+    state.flush()
+    # A crash between snapshot and truncation leaves stale events in the log
+    with open(state.log_file, 'a') as f:
+        f.write(json.dumps({'event': 'add', 'file': 'a.wav', 'seq': 1}) + '\n')
+        f.write('{"event": "status", "fi')
+
+    resumed = BatchState("b2", state_dir=tmp_path)
+    assert resumed.state['statistics']['total'] == 3
+    assert resumed.state['statistics']['completed'] == 1
+
+    resumed.set_file_status("b.wav", FileStatus.SUCCESS)
+    resumed.close()
+    assert BatchState("b2", state_dir=tmp_path).state['statistics']['completed'] == 2
+
+
+@pytest.mark.batch
+def test_cleanup_removes_snapshot_and_log(tmp_path):
+    state = BatchState("b3", state_dir=tmp_path)
+    state.add_file("a.wav")
+    state.close()
+    assert state.state_file.exists()
+
+    state.cleanup()
+    assert not state.state_file.exists()
+    assert not state.log_file.exists()
+
+
+@pytest.mark.batch
+def test_status_updates_do_not_wait_for_the_log(tmp_path):
+    state = BatchState("b4", state_dir=tmp_path)
+    state.add_file("a.wav")
+    state.flush()
+
+    with state._log_lock:
+        # Flusher is blocked; updates still return and apply in memory
+        state.set_file_status("a.wav", FileStatus.SUCCESS)
+        assert state.get_statistics()['completed'] == 1
+
+    state.close()
+    assert BatchState("b4", state_dir=tmp_path).get_statistics()['completed'] == 1
+
+
+@pytest.mark.batch
+def test_paths_are_resolved_once(tmp_path, monkeypatch):
+    from pathlib import Path
+
+    state = BatchState("b5", state_dir=tmp_path)
+    calls = []
+    original = Path.resolve
+    monkeypatch.setattr(Path, "resolve", lambda self, *a: calls.append(self) or original(self, *a))
+
+    state.add_file("a.wav")
+    state.set_file_status("a.wav", FileStatus.FAILED, last_error="boom")
+    assert state.get_file_state("a.wav")['attempts'] == 1
+    assert state.get_file_state("missing.wav") == {}
+    assert len(calls) == 2
+    state.close()
+
+
+@pytest.mark.batch
+def test_state_round_trips_without_orjson(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_state_manager, "ORJSON_AVAILABLE", False)
+    state = BatchState("b6", state_dir=tmp_path)
+    state.add_file("ä.wav")
+    state.set_file_status("ä.wav", FileStatus.FAILED, last_error="naïve")
+    state.close()
+
+    resumed = BatchState("b6", state_dir=tmp_path)
+    assert resumed.get_file_state("ä.wav")['last_error'] == "naïve"
+    resumed.close()
+
+
+@pytest.mark.batch
+def test_checkpoint_snapshots_only_after_interval(tmp_path, monkeypatch):
+    state = BatchState("b7", state_dir=tmp_path)
+    state.checkpoint()
+    assert not state.state_file.exists()
+
+    state.add_file("a.wav")
+    state.checkpoint()
+    assert not state.state_file.exists()
+
+    monkeypatch.setattr(batch_state_manager, "CHECKPOINT_INTERVAL", 0)
+    state.checkpoint()
+    assert json.loads(state.state_file.read_text())['seq'] == 1
+    state.close()
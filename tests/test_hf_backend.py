@@ -0,0 +1,46 @@
+"""
+Unit tests for the optional transformers backend.
+Uses a fake pipeline so neither torch nor transformers is needed.
+"""
+import numpy as np
+import pytest
+
+from transcription import hf_backend
+
+
+@pytest.mark.unit
+def test_model_names_map_to_hub_ids():
+    assert hf_backend.hf_model_id("medium") == "openai/whisper-medium"
+    assert hf_backend.hf_model_id("distil-large-v2") == "distil-whisper/distil-large-v2"
+    assert hf_backend.hf_model_id("openai/whisper-small") == "openai/whisper-small"
+
+
+@pytest.mark.unit
+def test_pipeline_output_is_normalized_to_segments():
+    calls = []
+
+    def pipe(inputs, **kwargs):
+        calls.append((inputs, kwargs))
+        return {"text": " Hi there. Bye.", "chunks": [
+            {"timestamp": (0.0, 1.5), "text": " Hi there.", "language": "english"},
+            {"timestamp": (2.0, None), "text": " Bye.", "language": "english"},
+        ]}
+
+    audio = np.zeros(3 * 16000, dtype=np.float32)
+    segments, info = hf_backend.transcribe(pipe, audio, None, batch_size=8)
+
+    inputs, kwargs = calls[0]
+    assert inputs["sampling_rate"] == 16000 and kwargs["batch_size"] == 8
+    assert "language" not in kwargs["generate_kwargs"]
+    assert [(s.id, s.start, s.end, s.text) for s in segments] == [
+        (1, 0.0, 1.5, " Hi there."),
+        (2, 2.0, 3.0, " Bye."),
+    ]
+    assert not hasattr(segments[0], "avg_logprob")
+    assert (info.language, info.duration) == ("english", 3.0)
+
+
+@pytest.mark.unit
+def test_missing_dependencies_fall_back(monkeypatch):
+    monkeypatch.setattr(hf_backend.importlib.util, "find_spec", lambda name: None)
+    assert hf_backend.load_pipeline("tiny") is None
@@ -66,6 +66,22 @@ class TestModelManager(unittest.TestCase):
         # Verify model.transcribe was called with quality parameters
         mock_model_instance.transcribe.assert_called_once()
 
+    def test_auto_compute_type_follows_device(self):
+        """'auto' resolves to int8 on CPU and int8_float16 on CUDA; explicit types pass through."""
+        manager = ModelManager()
+        
+        manager.device = "cpu"
+        self.assertEqual(manager._resolve_compute_type("auto"), "int8")
+        manager.device = "cuda"
+        self.assertEqual(manager._resolve_compute_type("auto"), "int8_float16")
+        self.assertEqual(manager._resolve_compute_type("float32"), "float32")
+        
+        manager.device = "auto"
+        with patch('ctranslate2.get_cuda_device_count', return_value=1):
+            self.assertEqual(manager._resolve_compute_type("auto"), "int8_float16")
+        with patch('ctranslate2.get_cuda_device_count', return_value=0):
+            self.assertEqual(manager._resolve_compute_type("auto"), "int8")
+
 
 @pytest.mark.unit
 class TestQualityModeConfiguration(unittest.TestCase):
@@ -221,6 +237,64 @@ class TestVADParameters(unittest.TestCase):
         if 'vad_parameters' in call_kwargs:
             self.assertIn('threshold', call_kwargs['vad_parameters'])
 
+    @patch('core.model_manager.WhisperModel')
+    @patch('core.model_manager.get_config_manager')
+    def test_vad_settings_reach_the_model(self, mock_get_config, mock_whisper):
+        """Configured VAD threshold and minimum silence are passed to faster-whisper."""
+        mock_config_manager = MagicMock()
+        mock_config_manager.get.side_effect = lambda key, default=None: {
+            'model.enable_vad': True,
+            'model.vad_threshold': 0.6,
+            'model.vad_min_silence_ms': 500,
+            'model.enable_dynamic_beam': False,
+        }.get(key, default)
+        mock_config_manager.model.name = 'medium'
+        mock_config_manager.model.compute_type = 'int8'
+        mock_config_manager.model.device = 'cpu'
+        mock_get_config.return_value = mock_config_manager
+        mock_model_instance = MagicMock()
+        mock_model_instance.transcribe.return_value = ([], MagicMock())
+        mock_whisper.return_value = mock_model_instance
+        
+        ModelManager().transcribe("test.wav")
+        
+        vad_parameters = mock_model_instance.transcribe.call_args[1]['vad_parameters']
+        self.assertEqual(vad_parameters['threshold'], 0.6)
+        self.assertEqual(vad_parameters['min_silence_duration_ms'], 500)
+        self.assertEqual(vad_parameters['speech_pad_ms'], ModelManager.VAD_PARAMS['speech_pad_ms'])
+
+    def test_device_index_all_spans_visible_gpus(self):
+        """device_index 'all' becomes one replica per GPU and multiplies parallel decoders."""
+        import sys
+        manager = ModelManager()
+        fake_ct2 = MagicMock()
+        fake_ct2.get_cuda_device_count.return_value = 2
+        with patch.dict(sys.modules, {'ctranslate2': fake_ct2}):
+            manager.device_index = manager._resolve_device_index("all")
+        manager.num_workers = 3
+        
+        self.assertEqual(manager.device_index, [0, 1])
+        self.assertEqual(manager.parallel_decoders, 6)
+        self.assertEqual(manager._resolve_device_index(1), 1)
+
+    @patch('core.model_manager.WhisperModel')
+    def test_batch_size_routes_through_batched_pipeline(self, mock_whisper):
+        """With batch_size > 1, decoding goes through BatchedInferencePipeline with VAD on."""
+        mock_pipeline = MagicMock()
+        mock_pipeline.transcribe.return_value = ([], MagicMock())
+        manager = ModelManager()
+        manager.batch_size = 8
+        
+        with patch('faster_whisper.BatchedInferencePipeline', return_value=mock_pipeline) as pipeline_cls:
+            manager.transcribe("test.wav", vad_filter=False)
+            manager.transcribe("test.wav")
+        
+        pipeline_cls.assert_called_once_with(model=mock_whisper.return_value)
+        call_kwargs = mock_pipeline.transcribe.call_args[1]
+        self.assertEqual((call_kwargs['batch_size'], call_kwargs['vad_filter']), (8, True))
+        self.assertIn('vad_parameters', call_kwargs)
+        mock_whisper.return_value.transcribe.assert_not_called()
+
     @patch('core.config.get_config_manager')
     def test_adaptive_vad_disabled_by_default(self, mock_config):
         """Test that adaptive VAD is disabled by default."""
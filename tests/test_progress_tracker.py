@@ -0,0 +1,33 @@
+"""
+Unit tests for ProgressTracker milestone events.
+"""
+import pytest
+
+from transcription.progress_tracker import ProgressTracker, EventType
+
+
+def _milestones(total, completed):
+    events = []
+    tracker = ProgressTracker(
+        total,
+        lambda event, data: events.append(data) if event == EventType.MILESTONE else None
+    )
+    for _ in range(completed):
+        tracker.segment_completed({})
+    return [(e['milestone_percent'], e['completed']) for e in events]
+
+
+@pytest.mark.unit
+def test_milestones_fire_once_at_first_count_reaching_them():
+    assert _milestones(10, 10) == [(25, 3), (50, 5), (75, 8), (100, 10)]
+
+
+@pytest.mark.unit
+def test_small_totals_skip_to_highest_reached_milestone():
+    assert _milestones(2, 2) == [(50, 1), (100, 2)]
+    assert _milestones(1, 1) == [(100, 1)]
+
+
+@pytest.mark.unit
+def test_overshooting_total_emits_no_extra_milestones():
+    assert _milestones(4, 6)[-1] == (100, 4)
@@ -0,0 +1,36 @@
+"""
+Unit tests for QualityMetricsCalculator.
+"""
+import json
+import pytest
+
+from transcription.quality_metrics import QualityMetricsCalculator
+
+
+@pytest.mark.unit
+def test_metrics_values_and_types():
+    segments = [
+        {'start': 0.0, 'end': 1.0, 'confidence': -0.1},
+        {'start': 1.0, 'end': 4.0, 'confidence': -0.2},
+        {'start': 4.0, 'end': 5.0, 'confidence': -0.9},
+        {'start': 5.0, 'end': 5.5, 'confidence': -0.4},
+    ]
+    metrics = QualityMetricsCalculator().calculate_metrics(segments)
+
+    assert metrics['confidence_simple_avg'] == pytest.approx(-0.4)
+    assert metrics['confidence_weighted_avg'] == pytest.approx((-0.1 - 0.6 - 0.9 - 0.2) / 5.5)
+    assert metrics['confidence_percentiles'] == {'p25': -0.4, 'p50_median': -0.2, 'p75': -0.1}
+    assert metrics['early_vs_late_diff'] == pytest.approx(0.5)
+    assert metrics['degradation_detected'] is True
+    assert metrics['avg_segment_duration'] == pytest.approx(1.375)
+    assert (metrics['confidence_min'], metrics['confidence_max']) == (-0.9, -0.1)
+    assert metrics['low_confidence_count'] == 1
+    assert QualityMetricsCalculator().calculate_metrics(segments, low_confidence_threshold=-0.3)['low_confidence_count'] == 2
+    # Results end up in JSON caches and reports, so no numpy scalars
+    json.dumps(metrics)
+
+
+@pytest.mark.unit
+def test_segments_without_confidence_use_defaults():
+    metrics = QualityMetricsCalculator().calculate_metrics([{'start': 0.0, 'end': 1.0}])
+    assert metrics['quality_tier'] == 'unknown'
@@ -0,0 +1,127 @@
+"""
+Unit tests for SegmentAnalyzer statistics.
+"""
+import json
+import pytest
+
+from transcription.segment_analyzer import SegmentAnalyzer
+
+
+@pytest.mark.unit
+def test_analysis_statistics():
+    segments = [
+        {'start': 0.0, 'end': 2.0, 'text': 'one two three four', 'confidence': -0.2},
+        {'start': 2.5, 'end': 4.5, 'text': 'five six', 'confidence': -0.4},
+        {'start': 4.6, 'end': 4.6, 'text': '', 'confidence': -3.0},
+        {'start': 5.0, 'end': 6.0, 'text': 'last'},
+    ]
+    analysis = SegmentAnalyzer().analyze_segments(segments)
+
+    assert analysis['avg_gap'] == pytest.approx((0.5 + 0.1 + 0.4) / 3)
+    assert analysis['avg_duration'] == pytest.approx((2.0 + 2.0 + 0.001) / 3)
+    assert analysis['speech_rate'] == pytest.approx((2.0 + 1.0 + 0.0) / 3)
+    # Confidences below -1.0 are ignored
+    assert analysis['confidence_mean'] == pytest.approx(-0.3)
+    assert analysis['total_segments'] == 4
+    assert analysis['analysis_quality'] == 'low'
+    json.dumps(analysis)
+
+
+@pytest.mark.unit
+def test_too_few_segments_use_defaults():
+    analysis = SegmentAnalyzer().analyze_segments([{'start': 0.0, 'end': 1.0, 'text': 'hi'}])
+    assert analysis['analysis_quality'] == 'unavailable'
+
+
+@pytest.mark.unit
+def test_compiled_and_numpy_kernels_agree():
+    import numpy as np
+    from transcription import _segment_kernels
+
+    rng = np.random.default_rng(0)
+    durations = rng.uniform(0.0, 3.0, 200)
+    gaps = rng.uniform(-0.1, 0.8, 200)
+    starts = np.concatenate([[0.0], np.cumsum(durations + gaps)[:-1]])
+    ends = starts + durations
+    word_counts = rng.integers(0, 12, 199).astype(np.float64)
+    confidences = rng.uniform(-2.0, 0.0, 199)
+
+    args = (starts, ends, word_counts, confidences)
+    expected = _segment_kernels._segment_stats_numpy(*args)
+    assert _segment_kernels.segment_stats(*args) == pytest.approx(expected)
+    assert _segment_kernels._segment_stats_kernel(*args) == pytest.approx(expected)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("words, expected", [("", 0.3), ("a b", 0.5), ("a b c", 0.7)])
+def test_threshold_follows_speech_rate_band(words, expected):
+    # Two one-second segments with a steady 0.1s gap: rate = word count per second
+    segments = [
+        {'start': 0.0, 'end': 1.0, 'text': words},
+        {'start': 1.1, 'end': 2.1, 'text': words},
+    ]
+    assert SegmentAnalyzer().analyze_segments(segments)['adaptive_threshold'] == expected
+
+
+@pytest.mark.unit
+def test_merge_batch_matches_pairwise_decisions():
+    import numpy as np
+
+    rng = np.random.default_rng(1)
+    segments, t = [], 0.0
+    for _ in range(50):
+        duration = rng.uniform(0.2, 2.0)
+        segments.append({'start': t, 'end': t + duration, 'text': 'x', 'confidence': rng.uniform(-2.0, 0.0)})
+        t += duration + rng.uniform(-0.05, 1.0)
+    analyzer = SegmentAnalyzer()
+    analysis = analyzer.analyze_segments(segments)
+
+    expected = [
+        analyzer.should_merge_segments(segments[i], segments[i + 1], analysis)[0]
+        for i in range(len(segments) - 1)
+    ]
+    assert analyzer.should_merge_batch(segments, analysis).tolist() == expected
+    assert analyzer.should_merge_batch(segments[:1], analysis).size == 0
+
+
+@pytest.mark.unit
+def test_merge_reason_is_only_formatted_on_request():
+    analyzer = SegmentAnalyzer()
+    current = {'start': 0.0, 'end': 1.0}
+    analysis = {'adaptive_threshold': 0.5}
+
+    assert analyzer.should_merge_segments(current, {'start': 1.05, 'end': 2.0}, analysis) == (True, "")
+    assert analyzer.should_merge_segments(current, {'start': 2.0, 'end': 3.0}, analysis) == (False, "")
+    _, reason = analyzer.should_merge_segments(current, {'start': 1.05, 'end': 2.0}, analysis, want_reason=True)
+    assert reason.startswith("micro_gap")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("text", ["", "   ", None, " Hello", " Hello there, world.", "one two"])
+def test_word_count_matches_split(text):
+    from transcription.segment_analyzer import _word_count
+    assert _word_count(text) == len((text or '').split())
+
+
+@pytest.mark.unit
+def test_merge_run_kernels_agree_with_pairwise_rule():
+    import numpy as np
+    from transcription import _segment_kernels
+
+    rng = np.random.default_rng(2)
+    n = 300
+    durations = rng.uniform(0.0, 2.0, n)
+    starts = np.concatenate([[0.0], np.cumsum(durations + rng.uniform(-0.1, 1.0, n))[:-1]])
+    ends = starts + durations
+    has_confidence = rng.random(n) > 0.1
+    confidences = np.where(has_confidence, rng.uniform(-2.5, 0.0, n), -1.0)
+
+    expected_runs = np.concatenate(([0], np.flatnonzero(~SegmentAnalyzer().merge_mask(
+        starts, ends, confidences, {'adaptive_threshold': 0.4})) + 1))
+    for merge_runs in (_segment_kernels._merge_runs_kernel, _segment_kernels._merge_runs_numpy,
+                       _segment_kernels.merge_runs):
+        runs, sums, weights = merge_runs(starts, ends, confidences, has_confidence, 0.4)
+        assert runs.tolist() == expected_runs.tolist()
+        assert weights.sum() == pytest.approx(durations[has_confidence].sum())
+        assert sums.sum() == pytest.approx((confidences * durations)[has_confidence].sum())
+
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import numpy as np
 
 # Add the project directory to the path so we can import modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -19,10 +20,13 @@ class TestAudioTranscriber(unittest.TestCase):
         
         # Set default attributes for the mock instance
         self.mock_model_manager_instance.model_size = "base"
+        self.mock_model_manager_instance.default_beam_size = 5
         
-        # Patch sys.modules to return our mock module
-        self.modules_patcher = patch.dict(sys.modules, {'core.model_manager': self.mock_model_manager_module})
-        self.modules_patcher.start()
+        # Swap in the mock module for this one key only; patch.dict(sys.modules)
+        # would also drop modules first imported during the test (soxr, numba
+        # internals), and native extensions fail when imported a second time
+        self._saved_model_manager = sys.modules.get('core.model_manager')
+        sys.modules['core.model_manager'] = self.mock_model_manager_module
         
         # Now import AudioTranscriber (it will use the mocked model_manager)
         from transcription.transcribe import AudioTranscriber
@@ -32,7 +36,10 @@ class TestAudioTranscriber(unittest.TestCase):
         self.transcriber = self.AudioTranscriber()
 
     def tearDown(self):
-        self.modules_patcher.stop()
+        if self._saved_model_manager is None:
+            sys.modules.pop('core.model_manager', None)
+        else:
+            sys.modules['core.model_manager'] = self._saved_model_manager
 
     def test_initialization(self):
         """Test that AudioTranscriber initializes with ModelManager."""
@@ -60,11 +67,12 @@ class TestAudioTranscriber(unittest.TestCase):
         mock_info.duration = 10.0
         self.mock_model_manager_instance.transcribe.return_value = (mock_segments, mock_info)
         
-        # Mock create_markdown and file operations to avoid writing to disk
-        with patch('transcription.transcribe.create_markdown', return_value="Mock Markdown"), \
+        # Mock markdown_parts and file operations to avoid writing to disk
+        with patch('transcription.transcribe.markdown_parts', return_value=["Mock Markdown"]), \
              patch('pathlib.Path.write_text'), \
-             patch('pathlib.Path.rename'), \
+             patch('pathlib.Path.replace'), \
              patch('pathlib.Path.exists', return_value=False), \
+             patch('transcription.transcribe.os.fsync'), \
              patch('transcription.transcribe.TRANSCRIPTION_FOLDER'):
             
             self.transcriber.transcribe_file("dummy_path.wav")
@@ -75,5 +83,383 @@ class TestAudioTranscriber(unittest.TestCase):
             self.assertEqual(args[0], "dummy_path.wav")
             self.assertEqual(kwargs['task'], "transcribe")
 
+    def test_progress_updates_are_throttled(self):
+        """Progress is reported once per progress_update_frequency percent, not per segment."""
+        self.transcriber.validate_audio_file = MagicMock(return_value=True)
+        self.transcriber.get_audio_metadata = MagicMock(return_value={
+            'filename': 'test.wav',
+            'file_size_mb': 1.0,
+            'duration_seconds': 10.0,
+            'duration_formatted': '0:10',
+            'file_extension': '.wav'
+        })
+        self.transcriber.enable_segment_filtering = False
+        self.transcriber.progress_update_frequency = 5
+        
+        segments = [
+            MagicMock(id=i, start=i * 0.1, end=(i + 1) * 0.1, text=f" word{i}", avg_logprob=-0.2)
+            for i in range(100)
+        ]
+        mock_info = MagicMock(language="en", language_probability=0.99, duration=10.0)
+        self.mock_model_manager_instance.transcribe.return_value = (segments, mock_info)
+        
+        messages = []
+        with patch('transcription.transcribe.markdown_parts', return_value=["Mock Markdown"]), \
+             patch('pathlib.Path.write_text'), \
+             patch('pathlib.Path.replace'), \
+             patch('pathlib.Path.exists', return_value=False), \
+             patch('transcription.transcribe.os.fsync'), \
+             patch('transcription.transcribe.TRANSCRIPTION_FOLDER'):
+            # Preloaded audio skips decoding
+            self.transcriber.transcribe_file(
+                "dummy_path.wav",
+                progress_callback=messages.append,
+                preloaded_audio=np.zeros(16000, dtype=np.float32)
+            )
+        
+        updates = [m for m in messages if m.startswith("Transcribing:")]
+        self.assertEqual(len(updates), 20)
+        self.assertTrue(updates[0].startswith("Transcribing: 4%"))
+        self.assertTrue(updates[-1].startswith("Transcribing: 99%") or updates[-1].startswith("Transcribing: 100%"))
+
+    def test_save_markdown_writes_in_chunks(self):
+        """Chunked writes produce the same file as a single write and replace old output."""
+        import tempfile
+        from pathlib import Path
+        text = "# Title\n" + "héllo wörld " * 50
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            (folder / "note.md").write_text("stale", encoding="utf-8")
+            with patch('transcription.transcribe.markdown_parts', return_value=[text[:20], text[20:]]), \
+                 patch('transcription.transcribe.TRANSCRIPTION_FOLDER', folder), \
+                 patch('transcription.transcribe.WRITE_CHUNK_CHARS', 7):
+                output_path = self.transcriber._save_markdown({'filename': 'note'})
+            self.assertEqual(output_path, folder / "note.md")
+            self.assertEqual(output_path.read_text(encoding="utf-8"), text)
+            self.assertFalse((folder / "note.tmp").exists())
+
+    def test_parallel_chunks_are_stitched_with_offsets(self):
+        """Long audio is split into overlapping chunks whose segments are shifted and de-duplicated."""
+        from faster_whisper.transcribe import Segment, TranscriptionInfo
+        
+        def make_segment(start, end, text):
+            return Segment(id=0, seek=0, start=start, end=end, text=text, tokens=[],
+                           avg_logprob=-0.2, compression_ratio=1.0, no_speech_prob=0.0,
+                           words=None, temperature=0.0)
+        
+        calls = []
+        
+        def transcribe(audio, language=None, task="transcribe", **kwargs):
+            calls.append((len(audio), language, kwargs.get('initial_prompt')))
+            # Every chunk hears a word in its leading overlap and one in its body
+            segments = [make_segment(0.1, 0.4, "overlap"), make_segment(1.0, 2.0, "body")]
+            info = TranscriptionInfo(language="en", language_probability=0.9, duration=len(audio) / 16000,
+                                     duration_after_vad=0.0, all_language_probs=None,
+                                     transcription_options=None, vad_options=None)
+            return iter(segments), info
+        
+        self.mock_model_manager_instance.transcribe.side_effect = transcribe
+        self.mock_model_manager_instance.num_workers = 2
+        self.transcriber.parallel_chunk_seconds = 10
+        audio = np.zeros(25 * 16000, dtype=np.float32)
+        
+        segments, info = self.transcriber._transcribe_chunked(audio, None, {'initial_prompt': "prior"})
+        
+        # Language is detected on the first chunk and reused; the prompt primes only that chunk
+        self.assertEqual(calls[0], (10 * 16000, None, "prior"))
+        self.assertEqual(sorted(calls[1:]), [(int(5.5 * 16000), "en", None), (int(10.5 * 16000), "en", None)])
+        self.assertEqual(info.duration, 25.0)
+        self.assertEqual([(s.id, s.text) for s in segments],
+                         [(1, "overlap"), (2, "body"), (3, "body"), (4, "body")])
+        self.assertEqual([s.start for s in segments], [0.1, 1.0, 10.5, 20.5])
+
+    def test_long_files_are_streamed_in_blocks(self):
+        """Blocks are decoded one at a time, shifted by their offset, with overlap segments dropped."""
+        import tempfile
+        import soundfile
+        from pathlib import Path
+        from faster_whisper.transcribe import Segment, TranscriptionInfo
+
+        def make_segment(start, end, text):
+            return Segment(id=0, seek=0, start=start, end=end, text=text, tokens=[],
+                           avg_logprob=-0.2, compression_ratio=1.0, no_speech_prob=0.0,
+                           words=None, temperature=0.0)
+
+        calls = []
+
+        def transcribe(audio, language=None, task="transcribe", **kwargs):
+            calls.append((audio.ndim, len(audio), language))
+            info = TranscriptionInfo(language="en", language_probability=0.9, duration=len(audio) / 16000,
+                                     duration_after_vad=0.0, all_language_probs=None,
+                                     transcription_options=None, vad_options=None)
+            return iter([make_segment(0.0, 0.1, "overlap"), make_segment(0.5, 0.7, "body")]), info
+
+        self.mock_model_manager_instance.transcribe.side_effect = transcribe
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = str(Path(tmp) / "long.wav")
+            soundfile.write(wav_path, np.zeros((48000, 2), dtype=np.float32), 16000)
+            with patch('transcription.transcribe.STREAM_BLOCK_SECONDS', 1), \
+                 patch('transcription.transcribe.CHUNK_OVERLAP_SECONDS', 0.25):
+                segments, info = self.transcriber._transcribe_streamed(wav_path, None, {})
+                self.assertEqual(len(calls), 1)  # Later blocks are read lazily
+                segments = list(segments)
+
+        self.assertEqual(info.duration, 3.0)
+        self.assertEqual(calls[:2], [(1, 16000, None), (1, 16000, "en")])
+        self.assertEqual([s.id for s in segments], list(range(1, len(segments) + 1)))
+        self.assertEqual([s.text for s in segments[:3]], ["overlap", "body", "body"])
+        self.assertEqual([s.start for s in segments[1:4]], [0.5, 1.25, 2.0])
+
+    def test_speech_chunks_are_cut_in_silence(self):
+        """VAD speech regions are grouped into chunks cut midway through the gaps between them."""
+        self.mock_model_manager_instance.vad_parameters = {}
+        speech = [{'start': 0, 'end': 4}, {'start': 6, 'end': 9}, {'start': 11, 'end': 14}, {'start': 20, 'end': 24}]
+        with patch('faster_whisper.vad.get_speech_timestamps', return_value=speech):
+            bounds = self.transcriber._speech_chunk_bounds(np.zeros(26, dtype=np.float32), 10)
+            self.assertEqual(bounds, [(0, 0, 10), (10, 10, 17), (17, 17, 26)])
+
+        with patch('faster_whisper.vad.get_speech_timestamps', return_value=speech[:1]):
+            self.assertIsNone(self.transcriber._speech_chunk_bounds(np.zeros(26, dtype=np.float32), 10))
+
+    def test_quality_metrics_summary(self):
+        """Confidence summary ignores segments without a confidence and handles none at all."""
+        self.transcriber.segment_merge_threshold = -0.5
+        segments = [
+            {'start': 0.0, 'end': 1.0, 'text': 'a', 'confidence': -0.2},
+            {'start': 1.0, 'end': 2.0, 'text': 'b', 'confidence': -0.9},
+            {'start': 2.0, 'end': 3.0, 'text': 'c'},
+        ]
+        summary = self.transcriber._calculate_quality_metrics(segments)
+        self.assertEqual(summary['low_confidence_count'], 1)
+        self.assertEqual((summary['min_confidence'], summary['max_confidence']), (-0.9, -0.2))
+        self.assertIsInstance(summary['low_confidence_count'], int)
+        
+        # Metrics already calculated for the segments are reused without another pass
+        metrics = self.transcriber.quality_metrics_calculator.calculate_metrics(segments, low_confidence_threshold=-0.5)
+        with patch.object(self.transcriber.quality_metrics_calculator, 'calculate_metrics',
+                          side_effect=AssertionError("recalculated")):
+            self.assertEqual(self.transcriber._calculate_quality_metrics(segments, metrics=metrics), summary)
+        
+        empty = self.transcriber._calculate_quality_metrics([{'start': 0.0, 'end': 1.0, 'text': 'a'}])
+        self.assertEqual((empty['low_confidence_count'], empty['min_confidence'], empty['max_confidence']), (0, 0.0, 0.0))
+
+    def test_adaptive_merge_groups_runs(self):
+        """Runs of close segments collapse into one with joined text and weighted confidence."""
+        segments = [
+            {'id': 1, 'start': 0.0, 'end': 1.0, 'text': 'one', 'confidence': -0.2},
+            {'id': 2, 'start': 1.1, 'end': 4.0, 'text': 'two', 'confidence': -0.6},
+            {'id': 3, 'start': 6.0, 'end': 7.0, 'text': 'three', 'confidence': -0.4},
+            {'id': 4, 'start': 7.0, 'end': 7.0, 'text': 'four', 'confidence': -0.1},
+        ]
+        merged = self.transcriber._merge_segments_adaptive(segments, {'adaptive_threshold': 0.5})
+        
+        self.assertEqual([(m['id'], m['start'], m['end'], m['text']) for m in merged],
+                         [(1, 0.0, 4.0, 'one two'), (3, 6.0, 7.0, 'three four')])
+        self.assertAlmostEqual(merged[0]['confidence'], (-0.2 * 1.0 + -0.6 * 2.9) / 3.9)
+        # A zero-length segment carries no weight
+        self.assertAlmostEqual(merged[1]['confidence'], -0.4)
+        # Inputs are not modified
+        self.assertEqual(segments[0]['end'], 1.0)
+
+    def test_duration_comes_from_decoder_not_a_probe(self):
+        """transcribe_file skips the metadata duration probe and uses info.duration."""
+        import tempfile
+        from pathlib import Path
+        self.transcriber.transcript_cache = None
+        self.transcriber._get_audio_info_cached = MagicMock(side_effect=AssertionError("probed"))
+        mock_info = MagicMock(language="en", language_probability=0.99, duration=125.0)
+        self.mock_model_manager_instance.transcribe.return_value = ([], mock_info)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            audio_path = Path(tmp) / "talk.wav"
+            audio_path.write_bytes(b"\0" * 1024)
+            with patch('transcription.transcribe.markdown_parts', return_value=["Mock Markdown"]), \
+                 patch('transcription.transcribe.TRANSCRIPTION_FOLDER', Path(tmp)):
+                _, data = self.transcriber.transcribe_file(
+                    str(audio_path), preloaded_audio=np.zeros(16000, dtype=np.float32)
+                )
+        
+        self.assertEqual((data['duration_seconds'], data['duration']), (125.0, "2:05"))
+        self.transcriber._get_audio_info_cached.assert_not_called()
+
+    def test_beam_size_follows_quality_mode(self):
+        """The beam comes from ModelManager's quality mode; distil models decode greedily."""
+        self.mock_model_manager_instance.default_beam_size = 3
+        self.assertEqual(self.AudioTranscriber().beam_size, 3)
+        self.mock_model_manager_instance.model_size = "distil-large-v3"
+        self.assertEqual(self.AudioTranscriber("distil-large-v3").beam_size, 1)
+
+    def test_cpu_decoding_disables_temperature_fallback(self):
+        """On CPU, transcribe_file decodes at one temperature without previous-text conditioning."""
+        self.mock_model_manager_instance.on_cuda = False
+        transcriber = self.AudioTranscriber()
+        transcriber.validate_audio_file = MagicMock(return_value=True)
+        transcriber.transcript_cache = None
+        mock_info = MagicMock(language="en", language_probability=0.99, duration=1.0)
+        self.mock_model_manager_instance.transcribe.return_value = ([], mock_info)
+
+        with patch('transcription.transcribe.markdown_parts', return_value=["Mock Markdown"]), \
+             patch.object(transcriber, '_save_markdown'):
+            transcriber.transcribe_file("clip.wav", preloaded_audio=np.zeros(16000, dtype=np.float32))
+
+        kwargs = self.mock_model_manager_instance.transcribe.call_args.kwargs
+        self.assertEqual((kwargs['temperature'], kwargs['condition_on_previous_text']), (0.0, False))
+        self.assertNotIn('temperature', self.transcriber.decode_overrides)
+
+    def test_vad_and_merge_settings_change_cache_key(self):
+        """Changing a VAD or merge setting misses entries cached under the old settings."""
+        import tempfile
+        from pathlib import Path
+        from transcription.transcript_cache import TranscriptCache
+        manager = self.mock_model_manager_instance
+        manager.vad_parameters = {'threshold': 0.5, 'min_silence_duration_ms': 2000}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            audio_path = Path(tmp) / "clip.wav"
+            audio_path.write_bytes(b"\0" * 1024)
+            cache = TranscriptCache(Path(tmp) / "cache")
+            make_key = lambda: cache.make_key(str(audio_path), "base", "en", settings=self.transcriber._cache_settings())
+            cache.put(make_key(), {'text': 'cached'})
+            self.assertIsNotNone(cache.get(make_key()))
+
+            manager.vad_parameters = {'threshold': 0.5, 'min_silence_duration_ms': 500}
+            self.assertIsNone(cache.get(make_key()))
+
+            manager.vad_parameters = {'threshold': 0.5, 'min_silence_duration_ms': 2000}
+            self.transcriber.min_segments_for_merge += 1
+            self.assertIsNone(cache.get(make_key()))
+
+    def test_short_transcripts_skip_segment_analysis(self):
+        """Fewer segments than min_segments_for_merge are neither analyzed nor merged."""
+        import tempfile
+        from pathlib import Path
+        self.transcriber.transcript_cache = None
+        self.transcriber.min_segments_for_merge = 8
+        self.transcriber.segment_analyzer = MagicMock()
+        segments = [MagicMock(id=i, start=float(i), end=i + 0.9, text=f" w{i}", avg_logprob=-0.2) for i in range(3)]
+        mock_info = MagicMock(language="en", language_probability=0.99, duration=3.0)
+        self.mock_model_manager_instance.transcribe.return_value = (segments, mock_info)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            audio_path = Path(tmp) / "clip.wav"
+            audio_path.write_bytes(b"\0" * 1024)
+            with patch('transcription.transcribe.markdown_parts', return_value=["Mock Markdown"]), \
+                 patch('transcription.transcribe.TRANSCRIPTION_FOLDER', Path(tmp)):
+                _, data = self.transcriber.transcribe_file(
+                    str(audio_path), preloaded_audio=np.zeros(16000, dtype=np.float32)
+                )
+
+        self.assertEqual(len(data['segments']), 3)
+        self.transcriber.segment_analyzer.analyze_segments.assert_not_called()
+
+    def test_transcribe_files_shares_this_transcriber(self):
+        """transcribe_files runs every file through this instance on a thread pool."""
+        import tempfile
+        from pathlib import Path
+        self.mock_model_manager_instance.parallel_decoders = 1
+        self.transcriber.enable_audio_preprocessing = False
+        
+        def transcribe_file(audio_file, **kwargs):
+            return Path(audio_file).with_suffix(".md"), {'duration': '0:01', 'language': 'en', 'processing_time_seconds': 0.1}
+        
+        self.transcriber.transcribe_file = MagicMock(side_effect=transcribe_file)
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [str(Path(tmp) / f"f{i}.wav") for i in range(3)]
+            cwd = os.getcwd()
+            os.chdir(tmp)  # batch state files are written to the working directory
+            try:
+                results = self.transcriber.transcribe_files(paths)
+            finally:
+                os.chdir(cwd)
+        
+        self.assertEqual(results['completed'], 3)
+        self.assertEqual(sorted(c.args[0] for c in self.transcriber.transcribe_file.call_args_list), paths)
+
+    def test_duration_probe_uses_ffprobe_header_read(self):
+        """Formats soundfile can't open get their duration from ffprobe, not a decode."""
+        from transcription import transcribe
+        completed = MagicMock(stdout="12.5\n")
+        with patch('transcription.transcribe.shutil.which', return_value='/usr/bin/ffprobe'), \
+             patch('transcription.transcribe.subprocess.run', return_value=completed) as run:
+            self.assertEqual(transcribe._probe_duration_ffprobe("song.mp3"), 12.5)
+            self.assertIn('format=duration', run.call_args.args[0])
+        
+        with patch('transcription.transcribe.shutil.which', return_value=None):
+            self.assertIsNone(transcribe._probe_duration_ffprobe("song.mp3"))
+    
+    def test_duration_probe_prefers_mutagen_headers(self):
+        """mutagen reads container headers in-process before ffprobe is tried."""
+        from transcription import transcribe
+        fake_mutagen = MagicMock()
+        fake_mutagen.File.return_value = MagicMock(info=MagicMock(length=42.0))
+        with patch('transcription.transcribe.MUTAGEN_AVAILABLE', True), \
+             patch('transcription.transcribe.mutagen', fake_mutagen, create=True), \
+             patch('transcription.transcribe._probe_duration_ffprobe') as ffprobe:
+            self.transcriber._get_audio_info_cached.cache_clear()
+            self.assertEqual(self.transcriber._get_audio_info_cached("missing.mp3")[0], 42.0)
+            ffprobe.assert_not_called()
+            
+            fake_mutagen.File.return_value = None
+            self.assertIsNone(transcribe._probe_duration_mutagen("unknown.bin"))
+
+    def test_audio_info_dispatches_on_extension(self):
+        """PCM WAV is read with the wave module; mp3 skips soundfile entirely."""
+        import tempfile
+        import wave
+        from pathlib import Path
+        self.transcriber._get_audio_info_cached.cache_clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = str(Path(tmp) / "tone.wav")
+            with wave.open(wav_path, 'wb') as w:
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(8000)
+                w.writeframes(b"\0" * 4 * 12000)
+            with patch('transcription.transcribe.soundfile.info') as info, \
+                 patch('transcription.transcribe.MUTAGEN_AVAILABLE', False), \
+                 patch('transcription.transcribe.shutil.which', return_value=None):
+                self.assertEqual(self.transcriber._get_audio_info_cached(wav_path), (1.5, 8000, 2))
+                self.assertEqual(self.transcriber._get_audio_info_cached("song.mp3"), (0, 16000, 1))
+                info.assert_not_called()
+
+    def test_decode_audio_downmixes_in_process(self):
+        """WAV decodes to mono float32 with libsndfile; containers are left to faster-whisper."""
+        import tempfile
+        import soundfile
+        from pathlib import Path
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = str(Path(tmp) / "stereo.wav")
+            stereo = np.stack([np.full(1600, 0.5), np.full(1600, -0.25)], axis=1)
+            soundfile.write(wav_path, stereo, 16000, subtype='FLOAT')
+            audio = self.transcriber._decode_audio(wav_path)
+
+        self.assertEqual((audio.dtype, audio.shape), (np.float32, (1600,)))
+        self.assertAlmostEqual(float(audio[0]), 0.125)
+        self.assertIsNone(self.transcriber._decode_audio("song.mp3"))
+
+    def test_decode_limit_counts_native_rate_and_channels(self):
+        """48kHz stereo is streamed once its native array, not its 16kHz mono one, is over the limit."""
+        import tempfile
+        import soundfile
+        from pathlib import Path
+        from transcription import transcribe
+        with tempfile.TemporaryDirectory() as tmp:
+            wav_path = str(Path(tmp) / "studio.wav")
+            soundfile.write(wav_path, np.zeros((4800, 2), dtype=np.float32), 48000)
+            # 4800 frames * 2 channels * 4 bytes = 38400 bytes; 16kHz mono would be 6400
+            with patch('transcription.transcribe.MAX_DECODE_BYTES', 20000):
+                self.assertTrue(transcribe._exceeds_decode_limit(wav_path))
+                with patch('transcription.transcribe.soundfile.read') as read:
+                    self.assertIsNone(self.transcriber._decode_audio(wav_path))
+                    read.assert_not_called()
+
+    def test_warmup_preloads_model_and_tolerates_failure(self):
+        """_warmup loads the model up front; a failed load is logged, not raised."""
+        self.transcriber._warmup()
+        self.mock_model_manager_instance.load_model.assert_called_once()
+        
+        self.mock_model_manager_instance.load_model.side_effect = RuntimeError("no model")
+        self.transcriber._warmup()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit tests for the content-addressed transcript cache.
+"""
+import os
+import pytest
+
+from transcription.transcript_cache import TranscriptCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TranscriptCache(tmp_path / "cache", max_entries=2)
+
+
+@pytest.mark.unit
+def test_key_depends_on_content_model_and_language(cache, tmp_path):
+    a = tmp_path / "a.wav"
+    b = tmp_path / "b.wav"
+    a.write_bytes(b"audio-bytes")
+    b.write_bytes(b"audio-bytes")
+
+    key = cache.make_key(str(a), "tiny", None)
+    assert key == cache.make_key(str(b), "tiny", "auto")
+    assert key != cache.make_key(str(a), "base", None)
+    assert key != cache.make_key(str(a), "tiny", "en")
+
+    b.write_bytes(b"other-bytes")
+    assert key != cache.make_key(str(b), "tiny", None)
+
+
+@pytest.mark.unit
+def test_key_depends_on_decoding_settings(cache, tmp_path):
+    a = tmp_path / "a.wav"
+    a.write_bytes(b"audio-bytes")
+
+    key = cache.make_key(str(a), "tiny", None, settings={'beam_size': 5, 'backend': 'faster-whisper'})
+    assert key == cache.make_key(str(a), "tiny", None, settings={'backend': 'faster-whisper', 'beam_size': 5})
+    assert key != cache.make_key(str(a), "tiny", None, settings={'beam_size': 1, 'backend': 'faster-whisper'})
+    assert key != cache.make_key(str(a), "tiny", None)
+
+
+@pytest.mark.unit
+def test_empty_file_can_be_hashed(cache, tmp_path):
+    empty = tmp_path / "empty.wav"
+    empty.write_bytes(b"")
+    assert cache.make_key(str(empty), "tiny", None).endswith("_tiny_auto")
+
+
+@pytest.mark.unit
+def test_round_trip_and_miss(cache):
+    assert cache.get("missing") is None
+    data = {'text': 'héllo', 'segments': [{'start': 0.0, 'end': 1.0, 'text': 'héllo'}]}
+    cache.put("k1", data)
+    assert cache.get("k1") == data
+
+
+@pytest.mark.unit
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.put("old", {'text': 'old'})
+    cache.put("new", {'text': 'new'})
+    os.utime(cache.cache_dir / "old.json", (1, 1))
+    os.utime(cache.cache_dir / "new.json", (2, 2))
+
+    cache.put("newest", {'text': 'newest'})
+
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+    assert cache.get("newest") is not None
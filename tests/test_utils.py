@@ -155,6 +155,57 @@ class TestTimestampFormatting(unittest.TestCase):
         self.assertEqual(result, "01:01:05")
         self.assertEqual(result.count(":"), 2)  # HH:MM:SS has 2 colons
 
+    def test_specialised_formatters_match_format_timestamp(self):
+        """The per-section formatters agree with format_timestamp for every second."""
+        from core.utils import _fmt_ts_long, _fmt_ts_short, format_timestamp
+
+        expected = [format_timestamp(s) for s in range(100000)]
+        self.assertEqual([_fmt_ts_long(s) for s in range(100000)], expected)
+        self.assertEqual([_fmt_ts_short(s) for s in range(3600)], expected[:3600])
+
+    def test_timestamps_section_matches_format_timestamp(self):
+        """Section lines agree with format_timestamp on both sides of the hour."""
+        from core.utils import create_timestamps_section, format_timestamp
+
+        for start in (59.9, 3590.5, 3605.2):
+            segments = [{'start': 1.2, 'end': 4.8, 'text': ' first '},
+                        {'start': start, 'end': start + 6.0, 'text': ' last '}]
+            result = create_timestamps_section(segments)
+            self.assertEqual(
+                result,
+                f"**{format_timestamp(1.2)} - {format_timestamp(4.8)}:** first\n\n"
+                f"**{format_timestamp(start)} - {format_timestamp(start + 6.0)}:** last"
+            )
+
+
+@pytest.mark.unit
+class TestTextHelpers(unittest.TestCase):
+    """Test suite for sentence splitting and filename sanitizing."""
+    
+    def test_split_into_sentences(self):
+        """Sentences split after terminal punctuation and come back stripped."""
+        from core.utils import split_into_sentences
+        
+        self.assertEqual(split_into_sentences("Hi there.  How are you?\nFine! ok"),
+                         ["Hi there.", "How are you?", "Fine!", "ok"])
+        self.assertEqual(split_into_sentences("No break.here"), ["No break.here"])
+        self.assertEqual(split_into_sentences("   "), [])
+
+    def test_sanitize_filename(self):
+        """Invalid characters are removed, spaces replaced and length capped."""
+        from core.utils import sanitize_filename
+        
+        self.assertEqual(sanitize_filename('a<b>:c "d"/e\\f|g?h*.md'), "abc_defgh.md")
+        self.assertEqual(len(sanitize_filename("x" * 300)), 200)
+
+    def test_format_duration(self):
+        """Durations render as seconds, M:SS or H:MM:SS."""
+        from core.utils import format_duration
+
+        self.assertEqual(format_duration(42), "42s")
+        self.assertEqual(format_duration(154), "2:34")
+        self.assertEqual(format_duration(5025), "1:23:45")
+
 
 @pytest.mark.unit
 class TestMetadataGeneration(unittest.TestCase):
@@ -5,17 +5,19 @@ Provides single-file transcription, batch processing, and text formatting.
 """
 
 from transcription.transcribe import AudioTranscriber
-from transcription.batch_processor import BatchTranscriber, batch_transcribe_files
+from transcription.batch_processor import BatchTranscriber, batch_transcribe_files, shutdown_process_pool
 from transcription.text_formatter import TextFormatter, format_transcript
 from transcription.segment_analyzer import SegmentAnalyzer
 from transcription.quality_metrics import QualityMetricsCalculator
 from transcription.batch_state_manager import BatchState, FileStatus
 from transcription.progress_tracker import ProgressTracker, EventType
+from transcription.transcript_cache import TranscriptCache
 
 __all__ = [
     'AudioTranscriber',
     'BatchTranscriber',
     'batch_transcribe_files',
+    'shutdown_process_pool',
     'TextFormatter',
     'format_transcript',
     'SegmentAnalyzer',
@@ -24,4 +26,5 @@ __all__ = [
     'FileStatus',
     'ProgressTracker',
     'EventType',
+    'TranscriptCache',
 ]
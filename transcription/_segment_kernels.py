@@ -0,0 +1,117 @@
+"""
+Segment Kernels
+Numeric kernels for segment analysis, JIT-compiled with numba when available
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _segment_stats_kernel(starts, ends, word_counts, confidences):
+    """
+    Fused pass over consecutive segments (all but the last).
+    Returns (avg_gap, std_dev_gap, avg_duration, avg_speech_rate,
+    confidence_mean, confidence_std). Deviations are sample standard
+    deviations accumulated with Welford's method, so they stay accurate for
+    long recordings; confidences below -1.0 are ignored.
+    """
+    n = starts.shape[0] - 1
+    mean_gap = 0.0
+    m2_gap = 0.0
+    sum_duration = 0.0
+    sum_rate = 0.0
+    conf_count = 0
+    mean_conf = 0.0
+    m2_conf = 0.0
+    for i in range(n):
+        gap = starts[i + 1] - ends[i]
+        duration = ends[i] - starts[i]
+        if duration < 0.001:
+            duration = 0.001  # Avoid division by zero
+        
+        delta = gap - mean_gap
+        mean_gap += delta / (i + 1)
+        m2_gap += delta * (gap - mean_gap)
+        sum_duration += duration
+        sum_rate += word_counts[i] / duration
+        
+        confidence = confidences[i]
+        if confidence >= -1.0:
+            conf_count += 1
+            delta = confidence - mean_conf
+            mean_conf += delta / conf_count
+            m2_conf += delta * (confidence - mean_conf)
+    
+    std_gap = math.sqrt(m2_gap / (n - 1)) if n > 1 else 0.0
+    std_conf = math.sqrt(m2_conf / (conf_count - 1)) if conf_count > 1 else 0.0
+    return mean_gap, std_gap, sum_duration / n, sum_rate / n, mean_conf, std_conf
+
+
+def _segment_stats_numpy(starts, ends, word_counts, confidences):
+    """Vectorized fallback with the same results as the compiled kernel."""
+    gaps = starts[1:] - ends[:-1]
+    durations = np.maximum(ends[:-1] - starts[:-1], 0.001)
+    confidences = confidences[confidences >= -1.0]
+    return (
+        float(gaps.mean()),
+        float(gaps.std(ddof=1)) if gaps.size > 1 else 0.0,
+        float(durations.mean()),
+        float((word_counts / durations).mean()),
+        float(confidences.mean()) if confidences.size else 0.0,
+        float(confidences.std(ddof=1)) if confidences.size > 1 else 0.0
+    )
+
+
+
+def _merge_runs_kernel(starts, ends, confidences, has_confidence, threshold):
+    """
+    Single scan splitting segments into runs to merge.
+    A pair merges when its gap is within threshold, unless both confidences
+    are known (> -1.0) and average below -1.5 (SegmentAnalyzer.should_merge_segments).
+    Returns (run_starts, confidence_sums, weights): the index each run starts
+    at, and per run the sum of confidence * duration and of duration over
+    segments that report a confidence.
+    """
+    n = starts.shape[0]
+    run_starts = np.empty(n, dtype=np.int64)
+    confidence_sums = np.zeros(n, dtype=np.float64)
+    weights = np.zeros(n, dtype=np.float64)
+    run = 0
+    run_starts[0] = 0
+    for i in range(n):
+        if i > 0:
+            merge = starts[i] - ends[i - 1] <= threshold
+            if merge and confidences[i - 1] > -1.0 and confidences[i] > -1.0:
+                if (confidences[i - 1] + confidences[i]) / 2 < -1.5:
+                    merge = False
+            if not merge:
+                run += 1
+                run_starts[run] = i
+        if has_confidence[i]:
+            duration = ends[i] - starts[i]
+            confidence_sums[run] += confidences[i] * duration
+            weights[run] += duration
+    return run_starts[:run + 1], confidence_sums[:run + 1], weights[:run + 1]
+
+
+def _merge_runs_numpy(starts, ends, confidences, has_confidence, threshold):
+    """Vectorized fallback with the same results as the compiled kernel."""
+    merge = starts[1:] - ends[:-1] <= threshold
+    both_known = (confidences[:-1] > -1.0) & (confidences[1:] > -1.0)
+    merge &= ~(both_known & ((confidences[:-1] + confidences[1:]) / 2 < -1.5))
+    
+    run_starts = np.concatenate(([0], np.flatnonzero(~merge) + 1))
+    durations = np.where(has_confidence, ends - starts, 0.0)
+    confidence_sums = np.add.reduceat(np.where(has_confidence, confidences, 0.0) * durations, run_starts)
+    return run_starts, confidence_sums, np.add.reduceat(durations, run_starts)
+
+
+# Compiled lazily on first call; cache=True keeps the machine code on disk
+segment_stats = njit(cache=True)(_segment_stats_kernel) if NUMBA_AVAILABLE else _segment_stats_numpy
+merge_runs = njit(cache=True)(_merge_runs_kernel) if NUMBA_AVAILABLE else _merge_runs_numpy
@@ -6,12 +6,19 @@ Provides optimized batch processing with thread and process pool support.
 
 import sys
 import os
-from pathlib import Path
+import heapq
+import atexit
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import partial
 from typing import List, Dict, Any, Optional, Callable
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
 import logging
 from datetime import datetime
-import multiprocessing
 
 # Force UTF-8 output on Windows
 if sys.platform == "win32":
@@ -32,17 +39,118 @@ import uuid
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def transcribe_single_file_worker(audio_file: str, model_size: str, language: str, formatting_style: str) -> Dict[str, Any]:
+# Process-global transcriber, built once per worker process by _init_worker
+_WORKER_TRANSCRIBER: Optional[AudioTranscriber] = None
+# Arguments for rebuilding it when the initializer's attempt failed
+_WORKER_ARGS: Optional[tuple] = None
+
+def _init_worker(model_size: str, language: str, cpu_threads: int = 0, core_sets=None):
+    """
+    ProcessPoolExecutor initializer: build the worker's transcriber (and load
+    its model) once, so every task in this process reuses it.
+    
+    With CPU pinning, the worker takes one core set from core_sets, binds
+    itself to it, and limits CTranslate2 to cpu_threads intra-op threads so
+    the workers together don't oversubscribe the machine.
+    """
+    global _WORKER_TRANSCRIBER, _WORKER_ARGS
+    _WORKER_ARGS = (model_size, language)
+    try:
+        if core_sets is not None:
+            try:
+                os.sched_setaffinity(0, core_sets.get_nowait())
+            except (queue.Empty, OSError, AttributeError):
+                pass  # No set left, or affinity unsupported on this platform
+        if cpu_threads:
+            from core.model_manager import ModelManager
+            ModelManager().cpu_threads = cpu_threads
+        _WORKER_TRANSCRIBER = AudioTranscriber(model_size, language)
+    except Exception as e:
+        # Don't break the pool; the next task retries the load
+        logger.error(f"Worker initialization failed: {e}")
+
+# Decoded audio the threaded batch loop may hold ahead of the file being transcribed
+PREFETCH_MAX_BYTES = 512 * 1024 * 1024
+
+# Process pool reused across batches so workers keep their loaded models
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+_PROCESS_POOL_KEY: Optional[tuple] = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+def _cpu_core_sets(workers: int) -> List[set]:
+    """Split the cores this process may run on into one contiguous set per worker."""
+    try:
+        cores = sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = list(range(os.cpu_count() or 1))
+    per_worker = max(1, len(cores) // workers)
+    return [set(cores[i * per_worker:(i + 1) * per_worker] or cores) for i in range(workers)]
+
+def _get_process_pool(max_workers: int, model_size: str, language: str, pin_cpus: bool = False) -> ProcessPoolExecutor:
+    """
+    Return the shared worker pool, creating it on first use. A pool built for
+    a different worker count, model, language or pinning (or a broken one)
+    is replaced.
+    """
+    global _PROCESS_POOL, _PROCESS_POOL_KEY
+    key = (max_workers, model_size, language) + ((True,) if pin_cpus else ())
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None and (_PROCESS_POOL_KEY != key or getattr(_PROCESS_POOL, '_broken', False)):
+            _PROCESS_POOL.shutdown(wait=True)
+            _PROCESS_POOL = None
+        if _PROCESS_POOL is None:
+            # Spawn, never fork: a forked worker would inherit the parent's
+            # ModelManager singleton, including an already loaded model and its
+            # CTranslate2 thread pools, so cpu_threads set in _init_worker
+            # would never apply
+            mp_context = multiprocessing.get_context("spawn")
+            initargs = (model_size, language)
+            if pin_cpus:
+                # Each worker claims one core set and sizes its CTranslate2
+                # thread pool to it
+                core_sets = _cpu_core_sets(max_workers)
+                core_queue = mp_context.Queue()
+                for cores in core_sets:
+                    core_queue.put(cores)
+                initargs += (len(core_sets[0]), core_queue)
+            # Each worker process loads its model once at start-up
+            _PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=initargs
+            )
+            _PROCESS_POOL_KEY = key
+        return _PROCESS_POOL
+
+@atexit.register
+def shutdown_process_pool():
+    """Shut down the shared worker pool (also run at interpreter exit)."""
+    global _PROCESS_POOL, _PROCESS_POOL_KEY
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None:
+            _PROCESS_POOL.shutdown(wait=True)
+            _PROCESS_POOL = None
+            _PROCESS_POOL_KEY = None
+
+def transcribe_single_file_worker(audio_file: str, formatting_style: str) -> Dict[str, Any]:
     """
     Top-level worker function for batch processing.
     Must be at module level for multiprocessing pickling.
+    
+    The worker writes the transcript itself and returns only a few scalars,
+    so no segments or audio arrays are pickled back to the parent process.
+    If the initializer could not build the transcriber, it is retried here,
+    so a transient load failure does not fail every task on this worker.
     """
+    global _WORKER_TRANSCRIBER
     try:
-        # Create a new transcriber instance for this process
-        # ModelManager singleton will handle model loading/sharing within the process
-        transcriber = AudioTranscriber(model_size, language)
+        if _WORKER_TRANSCRIBER is None:
+            if _WORKER_ARGS is None:
+                raise RuntimeError("Worker transcriber failed to initialize")
+            _WORKER_TRANSCRIBER = AudioTranscriber(*_WORKER_ARGS)
         
-        output_path, transcription_data = transcriber.transcribe_file(
+        output_path, transcription_data = _WORKER_TRANSCRIBER.transcribe_file(
             audio_file,
             formatting_style=formatting_style
         )
@@ -61,22 +169,125 @@ def transcribe_single_file_worker(audio_file: str, model_size: str, language: st
             'status': 'failed'
         }
 
+def _column_rows(columns: Dict[str, list]) -> List[Dict[str, Any]]:
+    """Turn column lists (one list per field) into a list of per-row dicts."""
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+class AudioPrefetcher:
+    """
+    Decodes upcoming batch files on background threads so disk reads and
+    audio decoding overlap with model inference on the current file.
+    Decoding pauses while the decoded arrays waiting to be taken add up to
+    max_bytes, so memory is bounded by size rather than by file count.
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        audio_files: List[str],
+        max_bytes: int = PREFETCH_MAX_BYTES,
+        workers: int = 2
+    ):
+        self._loader = loader
+        self._upcoming = deque(audio_files)
+        self._loaded: Dict[str, Future] = {}
+        self._sizes: Dict[str, int] = {}
+        # Files already taken (possibly before their prefetch started); never decoded again
+        self._taken: set = set()
+        self._held_bytes = 0
+        self._decoding = 0
+        self._max_bytes = max_bytes
+        self._workers = workers
+        # Re-entrant: a load that is already done runs its callback inside _fill
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-prefetch")
+        self._fill()
+    
+    def _fill(self):
+        with self._lock:
+            while self._upcoming and self._decoding < self._workers and self._held_bytes < self._max_bytes:
+                audio_file = self._upcoming.popleft()
+                if audio_file in self._loaded or audio_file in self._taken:
+                    continue
+                self._decoding += 1
+                future = self._executor.submit(self._loader, audio_file)
+                self._loaded[audio_file] = future
+                future.add_done_callback(partial(self._on_loaded, audio_file))
+    
+    def _on_loaded(self, audio_file: str, future: Future):
+        """Count a finished decode against the byte budget and keep the pipeline full."""
+        with self._lock:
+            self._decoding -= 1
+            # Skip loads already taken (or cancelled) while they were running
+            if self._loaded.get(audio_file) is future and not future.cancelled() and future.exception() is None:
+                size = int(getattr(future.result(), 'nbytes', 0))
+                self._sizes[audio_file] = size
+                self._held_bytes += size
+        self._fill()
+    
+    def take(self, audio_file: str) -> Any:
+        """Return decoded audio for a file, loading it inline if it was not prefetched."""
+        with self._lock:
+            future = self._loaded.pop(audio_file, None)
+            self._held_bytes -= self._sizes.pop(audio_file, 0)
+            self._taken.add(audio_file)
+        self._fill()
+        if future is None:
+            return self._loader(audio_file)
+        return future.result()
+    
+    def shutdown(self):
+        with self._lock:
+            self._upcoming.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loaded.clear()
+        self._sizes.clear()
+        self._taken.clear()
+
+def _cuda_available() -> bool:
+    """Return True if the transcription model runs on CUDA (ModelManager's device probe)."""
+    from core.model_manager import ModelManager
+    return ModelManager().on_cuda
+
 class BatchTranscriber:
     """
     Batch transcription processor with optimized concurrency support.
     """
     
+    # Delay before the first retry of a failed file; doubles per attempt
+    retry_backoff_seconds = 1.0
+    # Longest the batch loop blocks waiting for results before waking up
+    poll_interval_seconds = 1.0
+    
     def __init__(
         self, 
         model_size: str = WHISPER_MODEL,
         language: str = DEFAULT_LANGUAGE,
         max_workers: Optional[int] = None,
         use_multiprocessing: bool = True, # Default to True for better CPU utilization
-        transcriber: Optional[AudioTranscriber] = None
+        transcriber: Optional[AudioTranscriber] = None,
+        chain_context: bool = False,
+        pin_cpus: bool = False
     ):
         self.model_size = model_size
         self.language = language
         self.use_multiprocessing = use_multiprocessing
+        # Process mode only: bind each worker to its own cores (see _init_worker)
+        self.pin_cpus = pin_cpus
+        
+        # Context chaining: files are consecutive parts of one recording, so each
+        # file is decoded with the previous file's tail as prompt and a narrow beam.
+        # Requires in-order execution on the shared transcriber.
+        self.chain_context = chain_context
+        self._context_tail: Optional[str] = None
+        self._prefetcher: Optional[AudioPrefetcher] = None
+        if self.chain_context:
+            self.use_multiprocessing = False
+            max_workers = 1
+        
+        # Only probed when it affects the worker count or pool type; an explicit
+        # CPU device never reports CUDA, so process mode is kept there
+        on_cuda = (max_workers is None or self.use_multiprocessing) and _cuda_available()
         
         # Determine optimal worker count from config or defaults (optimized)
         if max_workers is None:
@@ -87,13 +298,7 @@ class BatchTranscriber:
             else:
                 # Auto-detect based on CPU and device (improved algorithm)
                 cpu_count = os.cpu_count() or 1
-                try:
-                    import torch
-                    has_gpu = torch.cuda.is_available()
-                except ImportError:
-                    has_gpu = False
-                
-                if has_gpu:
+                if on_cuda:
                     # GPU: More conservative to avoid memory issues
                     # Use 2-4 workers depending on CPU cores
                     self.max_workers = max(1, min(4, cpu_count // 2))
@@ -103,6 +308,13 @@ class BatchTranscriber:
                     self.max_workers = max(2, min(8, int(cpu_count * 0.75)))
         else:
             self.max_workers = max_workers
+        
+        # On a single GPU, one CUDA context per process makes workers contend for
+        # the device. Serve all files from one shared model instead; its CTranslate2
+        # workers (model.num_workers) run concurrent requests on the same context.
+        if self.use_multiprocessing and on_cuda:
+            logger.info("GPU detected: using shared-model thread pool instead of processes")
+            self.use_multiprocessing = False
             
         # Initialize transcriber ONLY if using threads (shared instance)
         self.transcriber = transcriber
@@ -111,7 +323,7 @@ class BatchTranscriber:
             self.transcriber = AudioTranscriber(model_size, language)
         
         logger.info(f"BatchTranscriber initialized: model={model_size}, workers={self.max_workers}, "
-                   f"multiprocessing={use_multiprocessing}")
+                   f"multiprocessing={self.use_multiprocessing}, chain_context={self.chain_context}")
     
     def transcribe_batch(
         self,
@@ -145,9 +357,16 @@ class BatchTranscriber:
             audio_files = batch_state.get_pending_files()
             logger.info(f"Resuming batch: {len(audio_files)} files remaining")
         
+        if self.chain_context:
+            # Name order keeps consecutive parts of a recording adjacent
+            audio_files = sorted(audio_files, key=os.path.basename)
+            self._context_tail = None
+        
+        # Column-wise result storage while the batch runs; returned as plain
+        # lists of dicts (see the end of this method)
+        successful = {'file': [], 'output': [], 'duration': [], 'language': []}
+        failed = {'file': [], 'error': []}
         results = {
-            'successful': [],
-            'failed': [],
             'total_files': batch_state.state['statistics']['total'],
             'completed': batch_state.state['statistics']['completed'],
             'failed_count': batch_state.state['statistics']['failed']
@@ -155,108 +374,134 @@ class BatchTranscriber:
         
         logger.info(f"Starting batch transcription of {len(audio_files)} files with {self.max_workers} workers")
         
-        ExecutorClass = ProcessPoolExecutor if self.use_multiprocessing else ThreadPoolExecutor
+        # Threaded mode shares one in-process model, so decode upcoming files
+        # ahead of time (pool threads pick files up in submission order).
+        # _preprocess_audio decodes whether or not preprocessing is enabled.
+        # With the transcript cache on, a hit never needs the audio, so
+        # nothing is decoded ahead of the cache lookup.
+        if not self.use_multiprocessing and self.transcriber.transcript_cache is None:
+            self._prefetcher = AudioPrefetcher(
+                self.transcriber._preprocess_audio,
+                audio_files
+            )
         
-        with ExecutorClass(max_workers=self.max_workers) as executor:
+        if self.use_multiprocessing:
+            # Shared across batches; the pool outlives this call
+            executor_context = nullcontext(
+                _get_process_pool(self.max_workers, self.model_size, self.language, self.pin_cpus)
+            )
+        else:
+            executor_context = ThreadPoolExecutor(max_workers=self.max_workers)
+        
+        with executor_context as executor:
+            # Bounded submit window: only a few futures per worker are in
+            # flight, so memory stays O(workers) and results start early
+            pending = deque(audio_files)
+            # Failed files as a heap of (ready_at, seq, file); a retry is submitted
+            # ahead of pending files once its backoff delay has elapsed
+            retry_queue = []
+            retry_seq = 0
+            # Chained parts run strictly in order: one file in flight, and a
+            # failed part is retried before the next part is started
+            window = 1 if self.chain_context else 2 * self.max_workers
             future_to_file = {}
             
-            for audio_file in audio_files:
-                if self.use_multiprocessing:
-                    # Pass simple types for multiprocessing
-                    future = executor.submit(
-                        transcribe_single_file_worker,
-                        audio_file,
-                        self.model_size,
-                        self.language,
-                        formatting_style
-                    )
-                else:
-                    # Use internal method for threading (can share self.transcriber)
-                    future = executor.submit(
-                        self._transcribe_single_file_threaded,
-                        audio_file,
-                        formatting_style
-                    )
-                future_to_file[future] = audio_file
-            
-            for future in as_completed(future_to_file):
-                audio_file = future_to_file[future]
-                batch_state.set_file_status(audio_file, FileStatus.IN_PROGRESS)
+            while pending or retry_queue or future_to_file:
+                while len(future_to_file) < window:
+                    if retry_queue and retry_queue[0][0] <= time.monotonic():
+                        audio_file = heapq.heappop(retry_queue)[2]
+                    elif pending and not (self.chain_context and retry_queue):
+                        audio_file = pending.popleft()
+                    else:
+                        break
+                    future_to_file[self._submit(executor, audio_file, formatting_style)] = audio_file
                 
-                try:
-                    result = future.result()
-                    
-                    if result.get('status') == 'failed':
-                        raise Exception(result.get('error', 'Unknown error'))
-                    
-                    # Success
-                    batch_state.set_file_status(
-                        audio_file, 
-                        FileStatus.SUCCESS,
-                        output_path=result.get('output_path')
-                    )
-                    
-                    results['successful'].append({
-                        'file': audio_file,
-                        'output': result['output_path'],
-                        'duration': result['duration'],
-                        'language': result['language']
-                    })
-                    results['completed'] += 1
-                    
-                    if progress_callback:
-                        progress_callback(
-                            results['completed'],
-                            results['total_files'],
-                            Path(audio_file).name
-                        )
-                    logger.info(f"✓ Completed: {Path(audio_file).name}")
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    file_state = batch_state.state['files'].get(str(Path(audio_file).resolve()), {})
-                    attempts = file_state.get('attempts', 0)
-                    
-                    if attempts < max_retries:
-                        # Retry
-                        logger.warning(f"Retrying {Path(audio_file).name} (attempt {attempts + 1}/{max_retries})")
+                # Wake up at least every poll interval (and for the next due
+                # retry) even if nothing completes, to checkpoint state
+                timeout = self.poll_interval_seconds
+                if retry_queue:
+                    timeout = min(timeout, max(0.0, retry_queue[0][0] - time.monotonic()))
+                batch_state.checkpoint()
+                if not future_to_file:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(future_to_file, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    audio_file = future_to_file.pop(future)
+                    # Plain string op; no Path object per completion
+                    file_name = os.path.basename(audio_file)
+                    batch_state.set_file_status(audio_file, FileStatus.IN_PROGRESS)
+                
+                    try:
+                        result = future.result()
+                        
+                        if result.get('status') == 'failed':
+                            raise Exception(result.get('error', 'Unknown error'))
+                        
+                        # Success
                         batch_state.set_file_status(
                             audio_file, 
-                            FileStatus.FAILED,
-                            last_error=error_msg
+                            FileStatus.SUCCESS,
+                            output_path=result.get('output_path')
                         )
-                        # Re-queue for retry
-                        if self.use_multiprocessing:
-                            future = executor.submit(
-                                transcribe_single_file_worker,
-                                audio_file,
-                                self.model_size,
-                                self.language,
-                                formatting_style
+                        
+                        successful['file'].append(audio_file)
+                        successful['output'].append(result['output_path'])
+                        successful['duration'].append(result['duration'])
+                        successful['language'].append(result['language'])
+                        results['completed'] += 1
+                        
+                        if progress_callback:
+                            progress_callback(
+                                results['completed'],
+                                results['total_files'],
+                                file_name
                             )
+                        logger.info("✓ Completed: %s", file_name)
+                        
+                    except Exception as e:
+                        error_msg = str(e)
+                        file_state = batch_state.get_file_state(audio_file)
+                        attempts = file_state.get('attempts', 0)
+                        
+                        if attempts < max_retries:
+                            # Retry
+                            logger.warning("Retrying %s (attempt %d/%d)", file_name, attempts + 1, max_retries)
+                            batch_state.set_file_status(
+                                audio_file, 
+                                FileStatus.FAILED,
+                                last_error=error_msg
+                            )
+                            # Re-queue for retry with exponential backoff
+                            delay = self.retry_backoff_seconds * (2 ** attempts)
+                            heapq.heappush(retry_queue, (time.monotonic() + delay, retry_seq, audio_file))
+                            retry_seq += 1
                         else:
-                            future = executor.submit(
-                                self._transcribe_single_file_threaded,
-                                audio_file,
-                                formatting_style
+                            # Max retries reached
+                            batch_state.set_file_status(
+                                audio_file, 
+                                FileStatus.FAILED,
+                                last_error=error_msg
                             )
-                        future_to_file[future] = audio_file
-                    else:
-                        # Max retries reached
-                        batch_state.set_file_status(
-                            audio_file, 
-                            FileStatus.FAILED,
-                            last_error=error_msg
-                        )
-                        results['failed'].append({'file': audio_file, 'error': error_msg})
-                        results['failed_count'] += 1
-                        logger.error(f"✗ Failed: {Path(audio_file).name} - {error_msg}")
+                            failed['file'].append(audio_file)
+                            failed['error'].append(error_msg)
+                            results['failed_count'] += 1
+                            if self.chain_context:
+                                # The next part does not continue from a missing one
+                                self._context_tail = None
+                            logger.error("✗ Failed: %s - %s", file_name, error_msg)
+        
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+            self._prefetcher = None
         
         # Statistics
         end_time = datetime.now()
         total_time = (end_time - start_time).total_seconds()
         batch_stats = batch_state.get_statistics()
         
+        results['successful'] = _column_rows(successful)
+        results['failed'] = _column_rows(failed)
         results['statistics'] = {
             'total_time_seconds': total_time,
             'throughput': results['completed'] / total_time if total_time > 0 else 0,
@@ -267,9 +512,19 @@ class BatchTranscriber:
         # Cleanup state if all files completed successfully
         if batch_stats['failed'] == 0 and batch_stats['pending'] == 0:
             batch_state.cleanup()
+        else:
+            batch_state.close()
         
         return results
     
+    def _submit(self, executor, audio_file: str, formatting_style: str) -> Future:
+        """Submit one file to the pool using the worker matching the executor type."""
+        if self.use_multiprocessing:
+            # Only simple types cross the process boundary; the model lives in the worker
+            return executor.submit(transcribe_single_file_worker, audio_file, formatting_style)
+        # Threads share self.transcriber
+        return executor.submit(self._transcribe_single_file_threaded, audio_file, formatting_style)
+    
     def _transcribe_single_file_threaded(self, audio_file: str, formatting_style: str) -> Dict[str, Any]:
         """Worker method for ThreadPoolExecutor (can use shared self.transcriber)."""
         # Use shared transcriber if available, otherwise create new
@@ -278,11 +533,18 @@ class BatchTranscriber:
         else:
             transcriber = AudioTranscriber(self.model_size, self.language)
         
+        prefetcher = self._prefetcher
         output_path, transcription_data = transcriber.transcribe_file(
             audio_file,
-            formatting_style=formatting_style
+            formatting_style=formatting_style,
+            initial_prompt=self._context_tail if self.chain_context else None,
+            preloaded_audio=prefetcher.take(audio_file) if prefetcher is not None else None
         )
         
+        if self.chain_context:
+            segments = transcription_data.get('segments') or []
+            self._context_tail = segments[-1]['text'] if segments else None
+        
         return {
             'output_path': str(output_path),
             'duration': transcription_data['duration'],
@@ -300,7 +562,8 @@ def batch_transcribe_files(
     progress_callback: Optional[Callable[[int, int, str], None]] = None,
     transcriber: Optional[AudioTranscriber] = None,
     enable_resume: bool = True,
-    max_retries: int = 2
+    max_retries: int = 2,
+    chain_context: bool = False
 ) -> Dict[str, Any]:
     """
     Enhanced batch transcription with resume and retry capabilities.
@@ -308,6 +571,7 @@ def batch_transcribe_files(
     Args:
         enable_resume: Enable resume from previous failed batch
         max_retries: Maximum retry attempts per file
+        chain_context: Treat files as consecutive parts of one recording
         ...existing args...
     """
     batch_transcriber = BatchTranscriber(
@@ -315,7 +579,8 @@ def batch_transcribe_files(
         language=language,
         max_workers=max_workers,
         use_multiprocessing=use_multiprocessing,
-        transcriber=transcriber
+        transcriber=transcriber,
+        chain_context=chain_context
     )
     
     batch_state = None
@@ -5,13 +5,46 @@ Manages batch processing state, persistence, and resumable operations
 
 import json
 import logging
+import queue
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from enum import Enum
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Compact the event log into a snapshot after this many events
+SNAPSHOT_INTERVAL = 500
+
+# checkpoint() also snapshots pending events once this many seconds have
+# passed, bounding log replay for slow batches with few events
+CHECKPOINT_INTERVAL = 30.0
+
+# The background flusher writes queued events at most every FLUSH_INTERVAL
+# seconds, or sooner once FLUSH_BATCH_SIZE events are waiting
+FLUSH_INTERVAL = 0.1
+FLUSH_BATCH_SIZE = 64
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _loads(data) -> Any:
+    """Parse JSON from bytes or str (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class FileStatus(str, Enum):
     """Status of a file in batch processing"""
     PENDING = "pending"
@@ -20,10 +53,27 @@ class FileStatus(str, Enum):
     FAILED = "failed"
     SKIPPED = "skipped"
 
+# Statistics counter affected by each status (None = not counted)
+_STATUS_STAT_KEY: Dict[str, Optional[str]] = {
+    FileStatus.PENDING.value: None,
+    FileStatus.IN_PROGRESS.value: None,
+    FileStatus.SUCCESS.value: 'completed',
+    FileStatus.FAILED.value: 'failed',
+    FileStatus.SKIPPED.value: 'skipped'
+}
+
+# Statuses still to be processed on resume (failed files are retried)
+_PENDING_STATUSES = frozenset({FileStatus.PENDING.value, FileStatus.FAILED.value})
+
 class BatchState:
     """
     Manages batch processing state with JSON persistence.
     Allows resume after crashes or cancellations.
+    
+    Each state change is appended as one line to a JSON-lines event log;
+    the full state is only written as a snapshot every SNAPSHOT_INTERVAL
+    events, which also truncates the log. Log writes happen on a background
+    flusher thread so callers never wait on disk.
     """
     
     def __init__(self, batch_id: str, state_dir: Path = Path('.batch_state')):
@@ -39,34 +89,107 @@ class BatchState:
         self.state_dir.mkdir(parents=True, exist_ok=True)
         
         self.state_file = self.state_dir / f"{batch_id}.json"
+        self.log_file = self.state_dir / f"{batch_id}.log"
+        self._seq = 0
+        self._events_since_snapshot = 0
+        self._last_snapshot = time.monotonic()
+        self._log = None
+        # file_path -> resolved state key; resolve() stats the filesystem
+        self._key_cache: Dict[str, str] = {}
+        self._log_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._flusher_thread: Optional[threading.Thread] = None
         self.state: Dict[str, Any] = self._load_state()
         
+        if self.log_file.exists() and self.log_file.stat().st_size > 0 \
+                and not self.log_file.read_bytes().endswith(b'\n'):
+            # Terminate a torn line so new events start on their own line
+            with open(self.log_file, 'ab') as f:
+                f.write(b'\n')
+        self._start_flusher()
+        
         logger.info(f"BatchState initialized: {batch_id}")
     
     def _load_state(self) -> Dict[str, Any]:
-        """Load state from disk, or create new"""
+        """Load the last snapshot from disk and replay the event log, or create new"""
+        state = None
         if self.state_file.exists():
             try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    state = _loads(f.read())
             except Exception as e:
                 logger.error(f"Failed to load state: {e}. Starting fresh.")
         
-        return {
-            'batch_id': self.batch_id,
-            'created_at': datetime.now().isoformat(),
-            'files': {},
-            'statistics': {
-                'total': 0,
-                'completed': 0,
-                'failed': 0,
-                'skipped': 0
+        if state is None:
+            state = {
+                'batch_id': self.batch_id,
+                'created_at': datetime.now().isoformat(),
+                'files': {},
+                'statistics': {
+                    'total': 0,
+                    'completed': 0,
+                    'failed': 0,
+                    'skipped': 0
+                }
             }
-        }
+        self.state = state
+        self._seq = state.get('seq', 0)
+        
+        if self.log_file.exists():
+            with open(self.log_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        event = _loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-write
+                        logger.warning(f"Skipping corrupt event in {self.log_file.name}")
+                        continue
+                    # Events at or before the snapshot are already applied
+                    if event['seq'] <= self._seq:
+                        continue
+                    self._apply(event)
+                    self._seq = event['seq']
+                    self._events_since_snapshot += 1
+        
+        return state
+    
+    def _apply(self, event: Dict[str, Any]):
+        """Apply one logged event to the in-memory state"""
+        if event['event'] == 'add':
+            self._apply_add(event['file'])
+        else:
+            self._apply_status(event['file'], FileStatus(event['status']), event['ts'], event.get('metadata', {}))
+    
+    def _append_event(self, event: Dict[str, Any]):
+        """Apply an event, append it to the log and snapshot periodically"""
+        self._seq += 1
+        event['seq'] = self._seq
+        self._apply(event)
+        
+        if self._flusher_thread is None:
+            self._start_flusher()
+        self._queue.put(_dumps(event))
+        
+        self._events_since_snapshot += 1
+        if self._events_since_snapshot >= SNAPSHOT_INTERVAL:
+            self._save_state()
     
     def add_file(self, file_path: str):
         """Register a file in the batch"""
-        file_key = str(Path(file_path).resolve())
+        self._append_event({'event': 'add', 'file': file_path})
+    
+    def _key(self, file_path: str) -> str:
+        """Return the state key for a file path, resolving each path only once"""
+        file_key = self._key_cache.get(file_path)
+        if file_key is None:
+            file_key = str(Path(file_path).resolve())
+            self._key_cache[file_path] = file_key
+        return file_key
+    
+    def _apply_add(self, file_path: str):
+        file_key = self._key(file_path)
         self.state['files'][file_key] = {
             'path': file_path,
             'status': FileStatus.PENDING.value,
@@ -77,7 +200,6 @@ class BatchState:
             'completed_at': None
         }
         self.state['statistics']['total'] += 1
-        self._save_state()
     
     def set_file_status(
         self, 
@@ -93,69 +215,66 @@ class BatchState:
             status: FileStatus enum value
             **kwargs: Additional metadata (error, output_path, etc.)
         """
-        file_key = str(Path(file_path).resolve())
+        file_key = self._key(file_path)
         if file_key not in self.state['files']:
             self.add_file(file_path)
         
+        self._append_event({
+            'event': 'status',
+            'file': file_path,
+            'status': status.value,
+            'ts': datetime.now().isoformat(),
+            'metadata': kwargs
+        })
+        
+        logger.debug(f"File status updated: {Path(file_path).name} → {status.value}")
+    
+    def _apply_status(self, file_path: str, status: FileStatus, ts: str, metadata: Dict[str, Any]):
+        file_key = self._key(file_path)
         file_state = self.state['files'][file_key]
         previous_status = file_state['status']
         
         file_state['status'] = status.value
-        file_state['updated_at'] = datetime.now().isoformat()
+        file_state['updated_at'] = ts
         
         # Update timestamps
         if status == FileStatus.IN_PROGRESS and not file_state.get('started_at'):
-            file_state['started_at'] = datetime.now().isoformat()
+            file_state['started_at'] = ts
         elif status in [FileStatus.SUCCESS, FileStatus.FAILED, FileStatus.SKIPPED]:
-            file_state['completed_at'] = datetime.now().isoformat()
+            file_state['completed_at'] = ts
         
         # Update statistics if status changed
         if previous_status != status.value:
             # Decrement old status count
-            old_status_key = {
-                FileStatus.PENDING.value: None,
-                FileStatus.IN_PROGRESS.value: None,
-                FileStatus.SUCCESS.value: 'completed',
-                FileStatus.FAILED.value: 'failed',
-                FileStatus.SKIPPED.value: 'skipped'
-            }.get(previous_status)
+            old_status_key = _STATUS_STAT_KEY.get(previous_status)
             
             if old_status_key:
                 self.state['statistics'][old_status_key] = max(0, self.state['statistics'][old_status_key] - 1)
             
             # Increment new status count
-            new_status_key = {
-                FileStatus.PENDING.value: None,
-                FileStatus.IN_PROGRESS.value: None,
-                FileStatus.SUCCESS.value: 'completed',
-                FileStatus.FAILED.value: 'failed',
-                FileStatus.SKIPPED.value: 'skipped'
-            }.get(status.value)
+            new_status_key = _STATUS_STAT_KEY.get(status.value)
             
             if new_status_key:
                 self.state['statistics'][new_status_key] = self.state['statistics'].get(new_status_key, 0) + 1
         
         # Store additional metadata
-        for key, value in kwargs.items():
+        for key, value in metadata.items():
             file_state[key] = value
         
         # Track attempts for failed files
         if status == FileStatus.FAILED:
             file_state['attempts'] = file_state.get('attempts', 0) + 1
-        
-        self._save_state()
-        
-        logger.debug(f"File status updated: {Path(file_path).name} → {status.value}")
+    
+    def get_file_state(self, file_path: str) -> Dict[str, Any]:
+        """Get the state record for a file, or an empty dict if unregistered"""
+        return self.state['files'].get(self._key(file_path), {})
     
     def get_pending_files(self) -> List[str]:
         """Get list of files that haven't been processed yet"""
         return [
             file_state['path']
             for file_state in self.state['files'].values()
-            if file_state['status'] in [
-                FileStatus.PENDING.value,
-                FileStatus.FAILED.value  # Retry failed files
-            ]
+            if file_state['status'] in _PENDING_STATUSES
         ]
     
     def get_statistics(self) -> Dict[str, Any]:
@@ -173,20 +292,95 @@ class BatchState:
             'pending': total - completed - stats.get('failed', 0) - stats.get('skipped', 0)
         }
     
+    def _start_flusher(self):
+        self._log = open(self.log_file, 'ab')
+        self._flusher_thread = threading.Thread(
+            target=self._flusher,
+            name=f"batch-state-{self.batch_id}",
+            daemon=True
+        )
+        self._flusher_thread.start()
+    
+    def _flusher(self):
+        """Write queued events to the log in batches until a None sentinel arrives"""
+        stop = False
+        while not stop:
+            lines = [self._queue.get()]
+            if lines[0] is None:
+                self._queue.task_done()
+                break
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(lines) < FLUSH_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    line = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if line is None:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                lines.append(line)
+            
+            try:
+                with self._log_lock:
+                    self._log.write(b'\n'.join(lines) + b'\n')
+                    self._log.flush()
+            except Exception as e:
+                logger.error(f"Failed to log state changes: {e}")
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+    
+    def flush(self):
+        """Block until every queued event has been written to the log"""
+        self._queue.join()
+    
+    def checkpoint(self):
+        """Snapshot if events are pending and CHECKPOINT_INTERVAL has elapsed"""
+        if self._events_since_snapshot and time.monotonic() - self._last_snapshot >= CHECKPOINT_INTERVAL:
+            self._save_state()
+    
+    def _stop_flusher(self):
+        if self._flusher_thread is None:
+            return
+        self._queue.put(None)
+        self._flusher_thread.join()
+        self._flusher_thread = None
+        self._log.close()
+    
     def _save_state(self):
-        """Persist state to disk"""
+        """Write a snapshot of the full state and truncate the event log"""
+        self.state['seq'] = self._seq
+        temp_path = self.state_file.with_suffix('.tmp')
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            with open(temp_path, 'wb') as f:
+                f.write(_dumps(self.state))
+            temp_path.replace(self.state_file)
+            # Logged events are now in the snapshot; events still queued are
+            # written afterwards and skipped on replay by their seq
+            with self._log_lock:
+                if self._log is not None and not self._log.closed:
+                    self._log.truncate(0)
+            self._events_since_snapshot = 0
+            self._last_snapshot = time.monotonic()
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
     
+    def close(self):
+        """Drain pending events, snapshot the state and close the event log"""
+        self._stop_flusher()
+        self._save_state()
+    
     def cleanup(self):
-        """Remove state file after successful completion"""
+        """Remove state files after successful completion"""
         try:
-            if self.state_file.exists():
-                self.state_file.unlink()
+            self._stop_flusher()
+            for path in (self.state_file, self.log_file):
+                if path.exists():
+                    path.unlink()
             logger.info(f"Cleaned up batch state: {self.batch_id}")
         except Exception as e:
             logger.warning(f"Could not clean up state file: {e}")
-
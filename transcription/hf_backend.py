@@ -0,0 +1,147 @@
+"""
+Transformers Backend
+Optional GPU transcription through a Hugging Face Whisper pipeline (fp16,
+Flash Attention 2 when installed, batched 30s chunks)
+"""
+
+import importlib.util
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+CHUNK_LENGTH_SECONDS = 30
+
+# faster-whisper model names that live under a different Hugging Face id
+_HF_MODEL_IDS = {
+    'distil-medium.en': 'distil-whisper/distil-medium.en',
+    'distil-large-v2': 'distil-whisper/distil-large-v2',
+    'distil-large-v3': 'distil-whisper/distil-large-v3',
+    'large': 'openai/whisper-large-v3',
+}
+
+_PIPELINES: Dict[str, Any] = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def hf_model_id(model_size: str) -> str:
+    """Map a faster-whisper model name to its Hugging Face model id"""
+    if '/' in model_size:
+        return model_size
+    return _HF_MODEL_IDS.get(model_size, f"openai/whisper-{model_size}")
+
+
+def load_pipeline(model_size: str) -> Optional[Any]:
+    """
+    Load (once per model) an fp16 speech-recognition pipeline on the GPU.
+
+    Returns:
+        The pipeline, or None when CUDA or transformers is unavailable or the
+        model could not be loaded, so callers can fall back to faster-whisper
+    """
+    # Probe without importing; torch and transformers take seconds to import
+    if importlib.util.find_spec('torch') is None or importlib.util.find_spec('transformers') is None:
+        logger.warning("Transformers backend requested but torch/transformers are not installed")
+        return None
+
+    model_id = hf_model_id(model_size)
+    with _PIPELINES_LOCK:
+        if model_id in _PIPELINES:
+            return _PIPELINES[model_id]
+
+        try:
+            import torch
+            from transformers import pipeline
+
+            if not torch.cuda.is_available():
+                logger.warning("Transformers backend requested but no CUDA device is available")
+                return None
+
+            # Flash Attention 2 needs Ampere (compute capability 8.0) or newer
+            major, _ = torch.cuda.get_device_capability()
+            use_flash = major >= 8 and importlib.util.find_spec('flash_attn') is not None
+
+            logger.info(f"Loading transformers pipeline: {model_id} "
+                       f"(fp16, attention={'flash_attention_2' if use_flash else 'sdpa'})")
+            pipe = pipeline(
+                "automatic-speech-recognition",
+                model=model_id,
+                torch_dtype=torch.float16,
+                device="cuda:0",
+                model_kwargs={"attn_implementation": "flash_attention_2" if use_flash else "sdpa"}
+            )
+        except Exception as e:
+            logger.warning(f"Transformers backend unavailable, using faster-whisper: {e}")
+            return None
+
+        _PIPELINES[model_id] = pipe
+        return pipe
+
+
+def transcribe(
+    pipe: Any,
+    audio,
+    language: Optional[str] = None,
+    batch_size: int = 24
+) -> Tuple[List[SimpleNamespace], SimpleNamespace]:
+    """
+    Transcribe with a pipeline from load_pipeline.
+
+    Args:
+        pipe: Speech-recognition pipeline
+        audio: Audio file path or 16kHz mono float32 array
+        language: Language code, or None to let Whisper detect it
+        batch_size: Number of 30s chunks decoded per GPU batch
+
+    Returns:
+        Tuple of (segments, info) shaped like faster-whisper's: segments have
+        .id/.start/.end/.text (no avg_logprob, the pipeline does not report it)
+        and info has .language/.language_probability/.duration
+    """
+    if isinstance(audio, np.ndarray):
+        inputs = {"raw": audio, "sampling_rate": SAMPLE_RATE}
+        duration = len(audio) / SAMPLE_RATE
+    else:
+        inputs = audio
+        duration = None
+
+    generate_kwargs = {"task": "transcribe"}
+    if language:
+        generate_kwargs["language"] = language
+
+    output = pipe(
+        inputs,
+        chunk_length_s=CHUNK_LENGTH_SECONDS,
+        batch_size=batch_size,
+        return_timestamps=True,
+        return_language=True,
+        generate_kwargs=generate_kwargs
+    )
+
+    chunks = output.get("chunks") or []
+    if duration is None:
+        duration = max((chunk["timestamp"][1] or chunk["timestamp"][0] or 0.0 for chunk in chunks), default=0.0)
+
+    segments = []
+    for chunk in chunks:
+        start, end = chunk["timestamp"]
+        segments.append(SimpleNamespace(
+            id=len(segments) + 1,
+            start=start or 0.0,
+            # The final chunk may have no end timestamp
+            end=end if end is not None else duration,
+            text=chunk["text"]
+        ))
+
+    detected = next((chunk.get("language") for chunk in chunks if chunk.get("language")), None)
+    info = SimpleNamespace(
+        language=language or detected or "unknown",
+        language_probability=1.0 if language else 0.0,
+        duration=duration
+    )
+    return segments, info
@@ -6,6 +6,7 @@ Event-driven progress tracking with milestone callbacks
 from typing import Callable, Optional, List
 from enum import Enum
 import logging
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -36,13 +37,20 @@ class ProgressTracker:
         self.total_segments = max(total_segments, 1)
         self.completed_segments = 0
         self.callback = callback
-        self.start_time = datetime.now()
+        # Monotonic seconds; elapsed times need no datetime objects
+        self.start_time = time.monotonic()
         self.milestones_hit = set()
         
+        # Segment count at which each milestone fires: the first count whose
+        # progress reaches it. When several share a count the highest wins.
+        self._milestone_counts = {}
+        for percent in (25, 50, 75, 100):
+            self._milestone_counts[-(-percent * self.total_segments // 100)] = percent
+        
         if self.callback:
             self._emit_event(EventType.STARTED, {
                 'total_segments': total_segments,
-                'timestamp': self.start_time.isoformat()
+                'timestamp': datetime.now().isoformat()
             })
     
     def segment_completed(self, segment_data: dict):
@@ -63,13 +71,12 @@ class ProgressTracker:
             })
         
         # Check for milestones (25%, 50%, 75%, 100%)
-        progress_percent = int((self.completed_segments / self.total_segments) * 100)
-        milestone = (progress_percent // 25) * 25
+        milestone = self._milestone_counts.get(self.completed_segments)
         
-        if milestone not in self.milestones_hit and milestone > 0:
+        if milestone is not None and milestone not in self.milestones_hit:
             self.milestones_hit.add(milestone)
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            eta_seconds = (elapsed / self.completed_segments) * (self.total_segments - self.completed_segments) if self.completed_segments > 0 else 0
+            elapsed = time.monotonic() - self.start_time
+            eta_seconds = (elapsed / self.completed_segments) * (self.total_segments - self.completed_segments)
             
             if self.callback:
                 self._emit_event(EventType.MILESTONE, {
@@ -99,7 +106,7 @@ class ProgressTracker:
     
     def completed(self):
         """Record completion and emit final event"""
-        total_time = (datetime.now() - self.start_time).total_seconds()
+        total_time = time.monotonic() - self.start_time
         if self.callback:
             self._emit_event(EventType.COMPLETED, {
                 'total_segments': self.completed_segments,
@@ -4,8 +4,8 @@ Calculates comprehensive quality metrics for transcription output
 """
 
 from typing import List, Dict, Any
-import statistics
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +16,15 @@ class QualityMetricsCalculator:
     
     def calculate_metrics(
         self,
-        segments: List[Dict[str, Any]]
+        segments: List[Dict[str, Any]],
+        low_confidence_threshold: float = -0.5
     ) -> Dict[str, Any]:
         """
         Calculate comprehensive quality metrics.
         
         Args:
             segments: List of segment dictionaries
+            low_confidence_threshold: Confidences below this count as low
             
         Returns:
             Dictionary with detailed quality metrics:
@@ -32,58 +34,60 @@ class QualityMetricsCalculator:
             - segment_count: Number of segments
             - avg_segment_duration: Average segment length in seconds
             - quality_tier: 'excellent'|'good'|'acceptable'|'poor'
+            - confidence_min / confidence_max: Confidence range
+            - low_confidence_count: Segments below low_confidence_threshold
         """
         if not segments:
             return self._default_metrics()
         
-        confidences = [
-            seg.get('confidence', -1.0) 
-            for seg in segments 
-            if 'confidence' in seg
-        ]
+        # Single pass over the segment dicts into parallel arrays
+        confs, durs, paired_conf, paired_dur = [], [], [], []
+        for seg in segments:
+            has_conf = 'confidence' in seg
+            if has_conf:
+                confs.append(seg['confidence'])
+            if 'start' in seg and 'end' in seg:
+                dur = seg['end'] - seg['start']
+                durs.append(dur)
+                if has_conf:
+                    paired_conf.append(seg['confidence'])
+                    paired_dur.append(dur)
         
-        if not confidences:
+        if not confs:
             return self._default_metrics()
         
-        # Calculate segment durations for weighting
-        durations = [
-            seg['end'] - seg['start'] 
-            for seg in segments 
-            if 'start' in seg and 'end' in seg
-        ]
+        confidences = np.array(confs, dtype=np.float64)
+        durations = np.array(durs, dtype=np.float64)
         
         # Weighted confidence: longer segments carry more weight
-        total_duration = sum(durations) if durations else 1.0
-        weighted_confidences = []
-        for i, seg in enumerate(segments):
-            if i < len(durations) and 'confidence' in seg:
-                weight = durations[i] / total_duration if total_duration > 0 else 1
-                weighted_confidences.append(seg['confidence'] * weight)
-        
-        weighted_avg = sum(weighted_confidences) if weighted_confidences else 0.0
-        
-        # Calculate percentiles
-        sorted_conf = sorted(confidences)
-        p25_idx = int(len(sorted_conf) * 0.25)
-        p50_idx = int(len(sorted_conf) * 0.50)
-        p75_idx = int(len(sorted_conf) * 0.75)
+        total_duration = durations.sum() if durations.size else 1.0
+        if paired_conf:
+            paired_dur = np.array(paired_dur, dtype=np.float64)
+            weights = paired_dur / total_duration if total_duration > 0 else np.ones_like(paired_dur)
+            weighted_avg = float((np.array(paired_conf, dtype=np.float64) * weights).sum())
+        else:
+            weighted_avg = 0.0
         
-        p25 = sorted_conf[p25_idx] if p25_idx < len(sorted_conf) else sorted_conf[0] if sorted_conf else 0.0
-        p50 = sorted_conf[p50_idx] if p50_idx < len(sorted_conf) else sorted_conf[0] if sorted_conf else 0.0
-        p75 = sorted_conf[p75_idx] if p75_idx < len(sorted_conf) else sorted_conf[-1] if sorted_conf else 0.0
+        # Calculate percentiles (nearest lower rank, index = int(n * q));
+        # a partial selection places just these three ranks in O(N)
+        ranks = (np.array([0.25, 0.50, 0.75]) * confidences.size).astype(int)
+        p25, p50, p75 = np.partition(confidences, ranks)[ranks].tolist()
         
-        # Detect degradation: compare early segments to late segments
+        # Detect degradation: compare early segments to late segments.
+        # The early half is a view; the late half is derived from the total.
         mid_point = len(segments) // 2
-        early_conf = confidences[:mid_point] if mid_point > 0 else []
-        late_conf = confidences[mid_point:] if mid_point < len(confidences) else []
+        total_conf = float(confidences.sum())
+        early_count = min(mid_point, confidences.size)
+        late_count = confidences.size - early_count
+        early_sum = float(confidences[:early_count].sum())
         
-        early_avg = statistics.mean(early_conf) if early_conf else 0
-        late_avg = statistics.mean(late_conf) if late_conf else 0
+        early_avg = early_sum / early_count if early_count else 0
+        late_avg = (total_conf - early_sum) / late_count if late_count else 0
         
         degradation_detected = (early_avg - late_avg) > 0.3  # > 0.3 is significant
         
         # Determine quality tier
-        avg_conf = statistics.mean(confidences)
+        avg_conf = total_conf / confidences.size
         if avg_conf > -0.3 and not degradation_detected:
             quality_tier = 'excellent'
         elif avg_conf > -0.8:
@@ -104,9 +108,12 @@ class QualityMetricsCalculator:
             'degradation_detected': degradation_detected,
             'early_vs_late_diff': early_avg - late_avg,
             'segment_count': len(segments),
-            'avg_segment_duration': statistics.mean(durations) if durations else 0,
+            'avg_segment_duration': float(durations.mean()) if durations.size else 0,
             'quality_tier': quality_tier,
-            'confidence_std': statistics.stdev(confidences) if len(confidences) > 1 else 0
+            'confidence_std': float(confidences.std(ddof=1)) if confidences.size > 1 else 0,
+            'confidence_min': float(confidences.min()),
+            'confidence_max': float(confidences.max()),
+            'low_confidence_count': int(np.count_nonzero(confidences < low_confidence_threshold))
         }
     
     def _default_metrics(self) -> Dict[str, Any]:
@@ -119,5 +126,8 @@ class QualityMetricsCalculator:
             'segment_count': 0,
             'avg_segment_duration': 0,
             'quality_tier': 'unknown',
-            'confidence_std': 0
+            'confidence_std': 0,
+            'confidence_min': 0.0,
+            'confidence_max': 0.0,
+            'low_confidence_count': 0
         }
@@ -4,23 +4,26 @@ Provides advanced metrics and pattern detection for transcription segments
 """
 
 from typing import List, Dict, Tuple, Any
-from dataclasses import dataclass
-import statistics
 import logging
+import numpy as np
+
+from transcription._segment_kernels import segment_stats
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class SegmentMetrics:
-    """Metrics for a single segment"""
-    duration: float
-    gap_after: float
-    confidence: float
-    word_count: int
+# Merge thresholds (seconds) for slow, normal and fast speech rates
+_SPEECH_RATE_THRESHOLDS = (0.3, 0.5, 0.7)
+
+def _word_count(text) -> int:
+    """Count space-separated words without building a list of them.
     
-    @property
-    def words_per_second(self) -> float:
-        return self.word_count / self.duration if self.duration > 0 else 0
+    Whisper segment text is single-spaced with a leading space, so stripping
+    the ends makes this match len(text.split()) for transcriber output.
+    """
+    if not text:
+        return 0
+    text = text.strip()
+    return text.count(' ') + 1 if text else 0
 
 class SegmentAnalyzer:
     """
@@ -30,7 +33,9 @@ class SegmentAnalyzer:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.segment_cache: Dict[str, List[SegmentMetrics]] = {}
+        # Per-segment metrics as packed (N, 4) float64 rows:
+        # [duration, gap_after, confidence, word_count]
+        self.segment_cache: Dict[str, np.ndarray] = {}
     
     def analyze_segments(
         self, 
@@ -54,51 +59,34 @@ class SegmentAnalyzer:
         if not segments or len(segments) < 2:
             return self._default_metrics()
         
-        # Extract metrics from segments
-        metrics = []
-        for i, seg in enumerate(segments[:-1]):  # Exclude last segment
-            next_seg = segments[i + 1]
-            gap = next_seg['start'] - seg['end']
-            
-            text = seg.get('text', '')
-            word_count = len(text.split()) if text else 0
-            duration = seg['end'] - seg['start']
-            
-            metric = SegmentMetrics(
-                duration=max(duration, 0.001),  # Avoid division by zero
-                gap_after=gap,
-                confidence=seg.get('confidence', -1.0),
-                word_count=word_count
-            )
-            metrics.append(metric)
-        
-        # Calculate statistics
-        gaps = [m.gap_after for m in metrics]
-        durations = [m.duration for m in metrics]
-        speech_rates = [m.words_per_second for m in metrics]
-        confidences = [m.confidence for m in metrics if m.confidence >= -1.0]
-        
-        avg_gap = statistics.mean(gaps) if gaps else 0.3
-        std_dev_gap = statistics.stdev(gaps) if len(gaps) > 1 else 0
-        avg_duration = statistics.mean(durations) if durations else 3.0
-        avg_speech_rate = statistics.mean(speech_rates) if speech_rates else 1.5
-        
-        # Adaptive threshold algorithm:
-        # If speech rate is fast (>2 wps), allow larger gaps (natural pauses)
-        # If speech rate is slow (<1 wps), use tighter thresholds (hesitations)
-        if avg_speech_rate > 2.0:
-            # Fast speaker: gaps < 0.7s are likely hesitations
-            adaptive_threshold = 0.7
-        elif avg_speech_rate < 1.0:
-            # Slow speaker: gaps < 0.3s are likely breathing
-            adaptive_threshold = 0.3
-        else:
-            # Normal speaker: gaps < 0.5s are likely hesitations
-            adaptive_threshold = 0.5
+        # Extract per-segment arrays once; metrics cover all but the last segment
+        count = len(segments)
+        starts = np.fromiter((seg['start'] for seg in segments), dtype=np.float64, count=count)
+        ends = np.fromiter((seg['end'] for seg in segments), dtype=np.float64, count=count)
+        head = segments[:-1]
+        word_counts = np.fromiter(
+            (_word_count(seg.get('text')) for seg in head),
+            dtype=np.float64,
+            count=count - 1
+        )
+        confidences = np.fromiter(
+            (seg.get('confidence', -1.0) for seg in head),
+            dtype=np.float64,
+            count=count - 1
+        )
+        
+        # Calculate all statistics in one fused pass
+        (avg_gap, std_dev_gap, avg_duration, avg_speech_rate,
+         confidence_mean, confidence_std) = segment_stats(starts, ends, word_counts, confidences)
+        
+        # Adaptive threshold algorithm (table lookup by speech rate band):
+        # Slow speaker (<1 wps): gaps < 0.3s are likely breathing
+        # Normal speaker: gaps < 0.5s are likely hesitations
+        # Fast speaker (>2 wps): gaps < 0.7s are likely hesitations
+        adaptive_threshold = _SPEECH_RATE_THRESHOLDS[(avg_speech_rate >= 1.0) + (avg_speech_rate > 2.0)]
         
         # Adjust for variability: high std dev = irregular pacing
-        if std_dev_gap > 0.2 and avg_gap > 0:
-            adaptive_threshold *= (1 + std_dev_gap / avg_gap)
+        adaptive_threshold *= 1.0 + (std_dev_gap / avg_gap if std_dev_gap > 0.2 and avg_gap > 0 else 0.0)
         
         return {
             'avg_gap': avg_gap,
@@ -106,17 +94,18 @@ class SegmentAnalyzer:
             'avg_duration': avg_duration,
             'speech_rate': avg_speech_rate,
             'adaptive_threshold': adaptive_threshold,
-            'confidence_mean': statistics.mean(confidences) if confidences else 0.0,
-            'confidence_std': statistics.stdev(confidences) if len(confidences) > 1 else 0.0,
-            'total_segments': len(segments),
-            'analysis_quality': 'high' if len(metrics) > 20 else 'medium' if len(metrics) > 10 else 'low'
+            'confidence_mean': confidence_mean,
+            'confidence_std': confidence_std,
+            'total_segments': count,
+            'analysis_quality': 'high' if count - 1 > 20 else 'medium' if count - 1 > 10 else 'low'
         }
     
     def should_merge_segments(
         self,
         current: Dict[str, Any],
         next_seg: Dict[str, Any],
-        analysis: Dict[str, Any]
+        analysis: Dict[str, Any],
+        want_reason: bool = False
     ) -> Tuple[bool, str]:
         """
         Determine if two segments should be merged based on analysis.
@@ -125,9 +114,11 @@ class SegmentAnalyzer:
             current: Current segment
             next_seg: Next segment
             analysis: Segment analysis results
+            want_reason: Format a human-readable reason (for logging)
             
         Returns:
-            Tuple of (should_merge: bool, reason: str)
+            Tuple of (should_merge: bool, reason: str); reason is empty
+            unless want_reason is True
         """
         gap = next_seg['start'] - current['end']
         current_conf = current.get('confidence', -1.0)
@@ -136,13 +127,16 @@ class SegmentAnalyzer:
         # Check 1: Gap too large
         adaptive_threshold = analysis.get('adaptive_threshold', 0.5)
         if gap > adaptive_threshold:
-            return False, f"gap_too_large: {gap:.3f}s > {adaptive_threshold:.3f}s"
+            return False, f"gap_too_large: {gap:.3f}s > {adaptive_threshold:.3f}s" if want_reason else ""
         
         # Check 2: Confidence too low (unless both are low)
         if current_conf > -1.0 and next_conf > -1.0:
             avg_conf = (current_conf + next_conf) / 2
             if avg_conf < -1.5:
-                return False, f"confidence_too_low: {avg_conf:.2f}"
+                return False, f"confidence_too_low: {avg_conf:.2f}" if want_reason else ""
+        
+        if not want_reason:
+            return True, ""
         
         # Check 3: Gap is negative (overlapping) - always merge
         if gap < 0:
@@ -155,6 +149,54 @@ class SegmentAnalyzer:
         # Default: merge if gap is within adaptive threshold
         return True, f"gap_acceptable: {gap:.3f}s <= {adaptive_threshold:.3f}s"
     
+    def should_merge_batch(
+        self,
+        segments: List[Dict[str, Any]],
+        analysis: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        Vectorized should_merge_segments over every adjacent pair.
+        
+        Merging keeps each pair's gap unchanged (the merged end is the next
+        segment's end), so all decisions can be made up front.
+        
+        Args:
+            segments: List of segments
+            analysis: Segment analysis results
+            
+        Returns:
+            Boolean array of length len(segments) - 1; entry i is True when
+            segment i + 1 should merge into segment i
+        """
+        count = len(segments)
+        if count < 2:
+            return np.zeros(0, dtype=bool)
+        
+        starts = np.fromiter((seg['start'] for seg in segments), dtype=np.float64, count=count)
+        ends = np.fromiter((seg['end'] for seg in segments), dtype=np.float64, count=count)
+        confs = np.fromiter((seg.get('confidence', -1.0) for seg in segments), dtype=np.float64, count=count)
+        return self.merge_mask(starts, ends, confs, analysis)
+    
+    def merge_mask(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        confs: np.ndarray,
+        analysis: Dict[str, Any]
+    ) -> np.ndarray:
+        """
+        should_merge_batch on per-segment arrays (confidence -1.0 where missing).
+        
+        Returns:
+            Boolean array of length len(starts) - 1
+        """
+        gaps = starts[1:] - ends[:-1]
+        merge = gaps <= analysis.get('adaptive_threshold', 0.5)
+        
+        both_known = (confs[:-1] > -1.0) & (confs[1:] > -1.0)
+        merge &= ~(both_known & ((confs[:-1] + confs[1:]) / 2 < -1.5))
+        return merge
+    
     def _default_metrics(self) -> Dict[str, Any]:
         """Return default metrics when analysis impossible"""
         return {
@@ -1,38 +1,128 @@
 import os
 import logging
+import shutil
+import subprocess
+import dataclasses
 import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, Callable, List
-import librosa
+from typing import Dict, Any, Optional, Callable, List, Union, Tuple
 import soundfile
 import numpy as np
 from functools import lru_cache
 
+try:
+    import mutagen
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
 
-from core.utils import create_markdown
+
+from core.utils import markdown_parts
 from core.config import (
     get_config_manager,
     WHISPER_MODEL, 
     TRANSCRIPTION_FOLDER, 
     SUPPORTED_LANGUAGES, 
+    SUPPORTED_FORMATS,
     DEFAULT_LANGUAGE, 
     ENSURE_UTF8_ENCODING, 
     OUTPUT_ENCODING
 )
 from transcription.segment_analyzer import SegmentAnalyzer
+from transcription._segment_kernels import merge_runs
 from transcription.quality_metrics import QualityMetricsCalculator
+from transcription.transcript_cache import TranscriptCache
+from transcription import hf_backend
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Markdown is encoded and written this many characters at a time, so long
+# transcripts never need a second full-size encoded copy in memory
+WRITE_CHUNK_CHARS = 1 << 20
+
+# Parallel chunked transcription: long audio is split into windows of
+# parallel_chunk_seconds, each starting CHUNK_OVERLAP_SECONDS early so words
+# on a boundary are heard whole by one of the two chunks
+SAMPLE_RATE = 16000
+CHUNK_OVERLAP_SECONDS = 0.5
+
+# Formats whose headers libsndfile reads directly; others are probed with mutagen/ffprobe
+_SOUNDFILE_EXTENSIONS = frozenset({'.wav', '.flac', '.ogg'})
+
+# Largest float32 array soundfile.read may allocate (native rate and channels,
+# before downmixing and resampling); bigger libsndfile-readable files are
+# streamed to the model in STREAM_BLOCK_SECONDS blocks instead
+MAX_DECODE_BYTES = 1 << 30
+STREAM_BLOCK_SECONDS = 600
+
+def _format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as M:SS, or "Unknown" when no duration is known."""
+    if not seconds:
+        return "Unknown"
+    return f"{int(seconds // 60)}:{(seconds % 60):02.0f}"
+
+def _probe_duration_mutagen(audio_path: str) -> Optional[float]:
+    """Read audio duration from container headers in-process with mutagen (no decoding)."""
+    if not MUTAGEN_AVAILABLE:
+        return None
+    try:
+        audio = mutagen.File(audio_path)
+    except Exception:
+        return None
+    if audio is None or getattr(audio, 'info', None) is None:
+        return None
+    return audio.info.length or None
+
+def _probe_duration_ffprobe(audio_path: str) -> Optional[float]:
+    """Read audio duration from container headers with ffprobe (no decoding)."""
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe is None:
+        return None
+    try:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', audio_path],
+            capture_output=True, text=True, timeout=2
+        )
+        return float(result.stdout.strip())
+    except (subprocess.SubprocessError, ValueError, OSError):
+        return None
+
+def _native_decode_bytes(info) -> int:
+    """Size of the float32 array soundfile.read allocates for a file (all frames and channels)."""
+    return info.frames * info.channels * 4
+
+def _exceeds_decode_limit(audio_path: str) -> bool:
+    """True for a libsndfile-readable file whose native float32 decode exceeds MAX_DECODE_BYTES."""
+    if os.path.splitext(audio_path)[1].lower() not in _SOUNDFILE_EXTENSIONS:
+        return False
+    try:
+        return _native_decode_bytes(soundfile.info(audio_path)) > MAX_DECODE_BYTES
+    except Exception:
+        return False
+
+def _to_model_rate(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Downmix to mono and resample to 16kHz float32 (no copy when already there)."""
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    if sample_rate != SAMPLE_RATE:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=sample_rate, target_sr=SAMPLE_RATE).astype(np.float32, copy=False)
+    return audio
+
 class AudioTranscriber:
     """
     High-Performance Audio Transcriber using faster-whisper (CTranslate2).
     Delivers up to 4x faster transcription with lower memory usage.
     """
     
+    # Shared, immutable lookup tables (not rebuilt per instance)
+    supported_formats = SUPPORTED_FORMATS
+    supported_languages = SUPPORTED_LANGUAGES
+    
     def __init__(self, model_size: str = WHISPER_MODEL, language: str = DEFAULT_LANGUAGE):
         """
         Initialize the transcriber using the ModelManager singleton.
@@ -50,17 +140,27 @@ class AudioTranscriber:
             logger.warning(f"Requested model '{model_size}' but ModelManager is configured for '{self.model_manager.model_size}'. Using ModelManager's model.")
             
         self.model_size = self.model_manager.model_size
-        self.supported_formats = {'.mp3', '.wav', '.m4a', '.flac', '.mp4', '.ogg', '.aac', '.wma'}
-        self.supported_languages = SUPPORTED_LANGUAGES
         self.language = language
         
-        # Optimization: Set beam size based on model type
-        self.beam_size = 1 if "distil" in self.model_size else 5
+        # Beam width follows model.quality_mode (high=5, balanced=3, fast=1);
+        # distil models are tuned for greedy decoding and always use 1
+        self.beam_size = 1 if "distil" in self.model_size else self.model_manager.default_beam_size
         
         # Load performance optimization settings from config
         config = get_config_manager()
+        
+        # On CPU, decode greedily at a single temperature without conditioning on
+        # the previous window: the fallback schedule re-decodes hard windows up to
+        # six times. GPU decoding keeps ModelManager's quality defaults.
+        self.decode_overrides = {}
+        if not self.model_manager.on_cuda:
+            self.decode_overrides = {
+                'temperature': config.get('transcription.cpu_temperature', 0.0),
+                'condition_on_previous_text': config.get('transcription.cpu_condition_on_previous_text', False),
+            }
         self.segment_merge_threshold = config.get('transcription.segment_merge_threshold', -0.5)
         self.min_segment_duration = config.get('transcription.min_segment_duration', 0.1)
+        self.min_segments_for_merge = config.get('transcription.min_segments_for_merge', 8)
         self.progress_update_frequency = config.get('transcription.progress_update_frequency', 5)
         self.enable_segment_filtering = config.get('transcription.enable_segment_filtering', True)
         self.enable_audio_normalization = config.get('transcription.enable_audio_normalization', True)
@@ -69,17 +169,52 @@ class AudioTranscriber:
         # Performance optimizations
         self.segment_cache_size = config.get('transcription.segment_cache_size', 1000)
         self.enable_parallel_segment_processing = config.get('transcription.enable_parallel_segments', False)
+        self.parallel_chunk_seconds = config.get('transcription.parallel_chunk_seconds', 30)
+        
+        # Optional GPU backend (transformers pipeline); None means faster-whisper
+        self._hf_pipe = None
+        self.hf_batch_size = config.get('model.hf_batch_size', 24)
+        if config.get('model.backend', 'faster-whisper') == 'transformers':
+            self._hf_pipe = hf_backend.load_pipeline(self.model_size)
+        
+        # Content-addressed transcript cache (skips re-decoding identical audio).
+        # Off by default: every miss hashes the whole file on top of decoding it.
+        # Relative directories live under the transcription folder, not the cwd.
+        self.transcript_cache = None
+        if config.get('transcription.enable_transcript_cache', False):
+            try:
+                self.transcript_cache = TranscriptCache(
+                    TRANSCRIPTION_FOLDER / config.get('transcription.transcript_cache_dir', '.transcript_cache'),
+                    max_entries=config.get('transcription.transcript_cache_max_entries', 500)
+                )
+            except Exception as e:
+                logger.warning(f"Transcript cache disabled: {e}")
         
         # Add segment analyzer and quality metrics calculator
         self.segment_analyzer = SegmentAnalyzer()
         self.quality_metrics_calculator = QualityMetricsCalculator()
         
+        # Load (and warm up) the model now rather than on the first transcription
+        if config.get('transcription.warmup_on_init', False):
+            self._warmup()
+        
         logger.info(f"AudioTranscriber initialized with model: {self.model_size}")
         logger.info(f"AudioTranscriber initialized with adaptive segment merging")
         logger.debug(f"Optimization settings: merge_threshold={self.segment_merge_threshold}, "
                     f"min_duration={self.min_segment_duration}s, progress_freq={self.progress_update_frequency}%, "
                     f"normalization={self.enable_audio_normalization}, preprocessing={self.enable_audio_preprocessing}")
 
+    def _warmup(self):
+        """
+        Load the model and run ModelManager's warm-up inference up front, so the
+        first user-visible transcription does not pay for loading weights from disk.
+        Failures are logged; the first transcription then retries the load.
+        """
+        try:
+            self.model_manager.load_model()
+        except Exception as e:
+            logger.warning(f"Model preload failed (non-critical): {e}")
+
     def set_language(self, language: str) -> bool:
         """Set the transcription language."""
         if language not in self.supported_languages and language != 'auto':
@@ -95,52 +230,91 @@ class AudioTranscriber:
         """Get dictionary of supported languages."""
         return self.supported_languages.copy()
 
-    def validate_audio_file(self, audio_path: str) -> bool:
-        """Validate if the audio file is supported and accessible."""
-        audio = Path(audio_path)
+    def validate_audio_file(self, audio_path: Union[str, Path]) -> os.stat_result:
+        """
+        Validate if the audio file is supported and accessible.
         
-        if not audio.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        Returns:
+            The file's stat result (truthy), so callers can reuse it instead of stat-ing again.
+        """
+        audio = audio_path if isinstance(audio_path, Path) else Path(audio_path)
         
         if audio.suffix.lower() not in self.supported_formats:
+            if not audio.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
             raise ValueError(f"Unsupported audio format: {audio.suffix}")
         
+        try:
+            st = audio.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
         # Check file size (faster-whisper handles larger files better, but let's keep a sane limit)
         # Increased limit to 2GB since we process efficiently
-        file_size_mb = audio.stat().st_size / (1024 * 1024)
+        file_size_mb = st.st_size / (1024 * 1024)
         if file_size_mb > 2048:
             raise ValueError(f"File too large: {file_size_mb:.1f}MB. Maximum size is 2GB.")
         
         logger.info(f"Audio file validation passed: {audio.name} ({file_size_mb:.1f}MB)")
-        return True
+        return st
 
     @lru_cache(maxsize=100)
     def _get_audio_info_cached(self, audio_path: str) -> tuple:
         """Cached audio info extraction for performance."""
-        try:
-            info = soundfile.info(audio_path)
-            return (info.duration, info.samplerate, info.channels)
-        except Exception:
+        # Callers pass str(path) for the lru_cache key; splitext avoids re-parsing it into a Path
+        suffix = os.path.splitext(audio_path)[1].lower()
+        if suffix == '.wav':
+            # PCM WAV headers are read by the stdlib without touching libsndfile;
+            # float/extensible WAVs raise wave.Error and go through soundfile
             try:
-                duration = librosa.get_duration(filename=audio_path)
-                return (duration, 16000, 1)  # Default assumptions
+                with wave.open(audio_path, 'rb') as w:
+                    return (w.getnframes() / w.getframerate(), w.getframerate(), w.getnchannels())
+            except (wave.Error, EOFError):
+                pass
+        
+        if suffix in _SOUNDFILE_EXTENSIONS:
+            try:
+                info = soundfile.info(audio_path)
+                return (info.duration, info.samplerate, info.channels)
             except Exception:
-                return (0, 16000, 1)
+                pass
+        
+        # Container formats libsndfile can't open (mp3/m4a/aac/wma/mp4): read the
+        # duration from the header instead of decoding the whole stream,
+        # in-process with mutagen first, then with an ffprobe subprocess
+        duration = _probe_duration_mutagen(audio_path) or _probe_duration_ffprobe(audio_path)
+        return (duration or 0, 16000, 1)  # Default assumptions
     
-    def get_audio_metadata(self, audio_path: str) -> Dict[str, Any]:
-        """Extract comprehensive audio metadata with caching."""
+    def get_audio_metadata(
+        self,
+        audio_path: Union[str, Path],
+        stat: Optional[os.stat_result] = None,
+        include_duration: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Extract comprehensive audio metadata with caching.
+        
+        Args:
+            audio_path: Path to the audio file (str or already-parsed Path)
+            stat: Optional stat result from validate_audio_file, to avoid a second stat call
+            include_duration: Probe the file for duration, sample rate and channels.
+                transcribe_file skips this and takes the duration from the decoder.
+        """
+        audio = audio_path if isinstance(audio_path, Path) else Path(audio_path)
         try:
-            audio = Path(audio_path)
-            file_size = audio.stat().st_size
+            file_size = (stat if stat is not None else audio.stat()).st_size
             
             # Use cached info extraction
-            duration, sample_rate, channels = self._get_audio_info_cached(str(audio))
+            if include_duration:
+                duration, sample_rate, channels = self._get_audio_info_cached(str(audio))
+            else:
+                duration, sample_rate, channels = 0, None, None
             
             metadata = {
                 'filename': audio.name,
                 'file_size_mb': file_size / (1024 * 1024),
                 'duration_seconds': duration,
-                'duration_formatted': f"{int(duration // 60)}:{(duration % 60):02.0f}" if duration else "Unknown",
+                'duration_formatted': _format_duration(duration),
                 'file_extension': audio.suffix.lower(),
                 'sample_rate': sample_rate,
                 'channels': channels
@@ -150,26 +324,56 @@ class AudioTranscriber:
         except Exception as e:
             logger.error(f"Could not extract metadata: {e}")
             return {
-                'filename': Path(audio_path).name,
+                'filename': audio.name,
                 'file_size_mb': 0,
                 'duration_seconds': 0,
                 'duration_formatted': "Unknown",
-                'file_extension': Path(audio_path).suffix.lower(),
+                'file_extension': audio.suffix.lower(),
                 'sample_rate': 16000,
                 'channels': 1
             }
     
+    def _decode_audio(self, audio_path: str) -> Optional[np.ndarray]:
+        """
+        Decode WAV/FLAC/OGG to 16kHz mono float32 in-process with libsndfile.
+        
+        Handing faster-whisper the array skips its ffmpeg decode of the file.
+        Returns None for other formats, unreadable files, or audio whose decoded
+        array (at the native rate and channel count) would exceed MAX_DECODE_BYTES.
+        """
+        if os.path.splitext(audio_path)[1].lower() not in _SOUNDFILE_EXTENSIONS:
+            return None
+        try:
+            info = soundfile.info(audio_path)
+            if _native_decode_bytes(info) > MAX_DECODE_BYTES:
+                return None
+            audio, sr = soundfile.read(audio_path, dtype='float32', always_2d=False)
+        except Exception as e:
+            logger.debug(f"In-process decode failed: {e}")
+            return None
+        return _to_model_rate(audio, sr)
+
     def _preprocess_audio(self, audio_path: str) -> Optional[np.ndarray]:
         """
         Preprocess audio for optimal transcription quality.
         Includes normalization, resampling, and noise reduction hints.
+        With preprocessing disabled, formats libsndfile reads are still decoded
+        (unmodified) so faster-whisper does not decode the file again.
         """
         if not self.enable_audio_preprocessing:
-            return None
+            return self._decode_audio(audio_path)
         
         try:
-            # Load audio with librosa (handles resampling automatically)
-            audio, sr = librosa.load(audio_path, sr=16000, mono=True, dtype=np.float32)
+            audio = self._decode_audio(audio_path)
+            if audio is None and _exceeds_decode_limit(audio_path):
+                # transcribe_file streams these in blocks; don't decode it whole here
+                return None
+            if audio is None:
+                # Deferred import keeps module import (and batch worker start-up) cheap
+                import librosa
+                
+                # Load audio with librosa (handles resampling automatically)
+                audio, sr = librosa.load(audio_path, sr=16000, mono=True, dtype=np.float32)
             
             # Normalize audio if enabled
             if self.enable_audio_normalization:
@@ -189,6 +393,308 @@ class AudioTranscriber:
             logger.warning(f"Audio preprocessing failed: {e}, using original file")
             return None
 
+    def _cache_settings(self) -> Dict[str, Any]:
+        """Settings that change transcripts, folded into transcript cache keys"""
+        manager = self.model_manager
+        return {
+            # Decoding
+            'backend': 'transformers' if self._hf_pipe is not None else 'faster-whisper',
+            'beam_size': self.beam_size,
+            'best_of': manager.default_best_of,
+            'patience': manager.DEFAULT_PARAMS.get('patience', 1.0),
+            'temperature': manager.DEFAULT_PARAMS['temperature'],
+            'dynamic_beam': manager.enable_dynamic_beam,
+            'compute_type': str(manager.compute_type),
+            'batch_size': manager.batch_size,
+            'vad': (manager.enable_vad, manager.adaptive_vad, sorted(manager.vad_parameters.items())),
+            'parallel_chunk_seconds': self.parallel_chunk_seconds if self.enable_parallel_segment_processing else None,
+            # CPU overrides replace the temperature schedule above
+            **self.decode_overrides,
+            # Post-processing applied before results are cached
+            'enable_segment_filtering': self.enable_segment_filtering,
+            'min_segment_duration': self.min_segment_duration,
+            'segment_merge_threshold': self.segment_merge_threshold,
+            'min_segments_for_merge': self.min_segments_for_merge,
+        }
+
+    def transcribe_files(
+        self,
+        audio_paths: List[str],
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        formatting_style: str = "auto",
+        max_retries: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Transcribe several files concurrently on this transcriber's shared model.
+        
+        Runs BatchTranscriber in thread mode with this instance, so the model is
+        loaded once and concurrent requests run on its CTranslate2 workers (on
+        every GPU listed in model.device_index). Progress callbacks are made
+        from the calling thread, never from the pool.
+        
+        Args:
+            audio_paths: Audio file paths
+            max_workers: Concurrent files (default: the model's parallel decoders,
+                at least 2 so audio decoding overlaps with inference)
+            progress_callback: Optional callback(completed, total, file_name)
+            formatting_style: Formatting style for the output markdown
+            max_retries: Maximum retry attempts per file
+            
+        Returns:
+            Batch results as returned by BatchTranscriber.transcribe_batch
+        """
+        from transcription.batch_processor import BatchTranscriber
+        
+        batch = BatchTranscriber(
+            model_size=self.model_size,
+            language=self.language,
+            max_workers=max_workers or max(2, self.model_manager.parallel_decoders),
+            use_multiprocessing=False,
+            transcriber=self
+        )
+        return batch.transcribe_batch(
+            list(audio_paths),
+            progress_callback=progress_callback,
+            formatting_style=formatting_style,
+            max_retries=max_retries
+        )
+
+    def transcribe_files_mp(
+        self,
+        audio_paths: List[str],
+        n_procs: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        formatting_style: str = "auto",
+        max_retries: int = 2
+    ) -> Dict[str, Any]:
+        """
+        Transcribe several files in parallel worker processes, for CPU-only hosts.
+        
+        CTranslate2 already threads each forward pass, but on batches of short
+        files per-file overhead dominates and one process per file scales better.
+        Each worker loads its own model once, is pinned to its share of the cores
+        and runs CTranslate2 with that many threads. With a GPU present,
+        BatchTranscriber falls back to threads on this shared transcriber.
+        
+        Args:
+            audio_paths: Audio file paths
+            n_procs: Worker processes (default: a quarter of the CPU cores, at least 1)
+            progress_callback: Optional callback(completed, total, file_name)
+            formatting_style: Formatting style for the output markdown
+            max_retries: Maximum retry attempts per file
+            
+        Returns:
+            Batch results as returned by BatchTranscriber.transcribe_batch
+        """
+        from transcription.batch_processor import BatchTranscriber
+        
+        batch = BatchTranscriber(
+            model_size=self.model_size,
+            language=self.language,
+            max_workers=n_procs or max(1, (os.cpu_count() or 1) // 4),
+            use_multiprocessing=True,
+            transcriber=self,
+            pin_cpus=True
+        )
+        return batch.transcribe_batch(
+            list(audio_paths),
+            progress_callback=progress_callback,
+            formatting_style=formatting_style,
+            max_retries=max_retries
+        )
+
+    def _speech_chunk_bounds(
+        self,
+        audio: np.ndarray,
+        chunk_samples: int
+    ) -> Optional[List[Tuple[int, int, int]]]:
+        """
+        Cut audio into chunks of about chunk_samples in the silences between speech.
+        
+        Speech regions come from faster-whisper's VAD with the model's VAD
+        settings. Each cut falls midway between two regions, so no word
+        straddles a cut and chunks need no overlap; a single region longer
+        than chunk_samples stays whole.
+        
+        Returns:
+            (start, start, end) sample bounds per chunk, in the layout
+            _transcribe_chunked uses, or None if VAD is unavailable or
+            leaves nothing to cut
+        """
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+            speech = get_speech_timestamps(audio, VadOptions(**self.model_manager.vad_parameters))
+        except Exception as e:
+            logger.debug(f"VAD chunking unavailable, using fixed windows: {e}")
+            return None
+        
+        cuts = [0]
+        for previous, current in zip(speech, speech[1:]):
+            if current['end'] - cuts[-1] > chunk_samples:
+                cuts.append((previous['end'] + current['start']) // 2)
+        if len(cuts) < 2:
+            return None
+        cuts.append(len(audio))
+        return [(start, start, end) for start, end in zip(cuts[:-1], cuts[1:])]
+
+    def _transcribe_chunked(
+        self,
+        audio: np.ndarray,
+        language: Optional[str],
+        transcribe_kwargs: Dict[str, Any]
+    ) -> Tuple[List[Any], Any]:
+        """
+        Transcribe long audio as chunks decoded in parallel.
+        
+        Chunks are cut in silences found by VAD (_speech_chunk_bounds), or
+        failing that, as fixed windows that each start CHUNK_OVERLAP_SECONDS
+        early. They run on a thread pool sized to the model's CTranslate2
+        workers, which decode concurrently on one loaded model. Segment times
+        are shifted by each chunk's offset; segments centred in a chunk's
+        leading overlap are dropped, since the previous chunk already covers them.
+        
+        Args:
+            audio: 16kHz mono float32 audio
+            language: Language code, or None to detect it on the first chunk
+            transcribe_kwargs: Extra arguments for ModelManager.transcribe
+            
+        Returns:
+            Tuple of (segments, info) like ModelManager.transcribe, with info.duration
+            covering the whole audio
+        """
+        chunk_samples = int(self.parallel_chunk_seconds * SAMPLE_RATE)
+        overlap_samples = int(CHUNK_OVERLAP_SECONDS * SAMPLE_RATE)
+        # (start, boundary, end) sample offsets; audio before boundary is overlap
+        chunks = self._speech_chunk_bounds(audio, chunk_samples)
+        if chunks is None:
+            chunks = [
+                (max(0, boundary - overlap_samples), boundary, boundary + chunk_samples)
+                for boundary in range(0, len(audio), chunk_samples)
+            ]
+        # Context from a previous file only applies to the opening chunk
+        chunk_kwargs = {k: v for k, v in transcribe_kwargs.items() if k != 'initial_prompt'}
+        
+        def run_chunk(index: int, chunk_language: Optional[str]):
+            start, boundary, end = chunks[index]
+            segments, info = self.model_manager.transcribe(
+                audio[start:end],
+                language=chunk_language,
+                task="transcribe",
+                **(transcribe_kwargs if index == 0 else chunk_kwargs)
+            )
+            # Consume the generator here so decoding happens on this worker thread
+            return start / SAMPLE_RATE, boundary / SAMPLE_RATE, list(segments), info
+        
+        with ThreadPoolExecutor(
+            max_workers=max(1, self.model_manager.num_workers),
+            thread_name_prefix="transcribe-chunk"
+        ) as executor:
+            if language is None:
+                # Detect the language once so every chunk decodes in the same one
+                first = run_chunk(0, None)
+                language = first[3].language
+                futures = [executor.submit(run_chunk, i, language) for i in range(1, len(chunks))]
+                results = [first] + [future.result() for future in futures]
+            else:
+                futures = [executor.submit(run_chunk, i, language) for i in range(len(chunks))]
+                results = [future.result() for future in futures]
+        
+        stitched = []
+        for offset, boundary, segments, _ in results:
+            for segment in segments:
+                start, end = segment.start + offset, segment.end + offset
+                if (start + end) / 2 < boundary:
+                    continue
+                words = segment.words and [
+                    dataclasses.replace(word, start=word.start + offset, end=word.end + offset)
+                    for word in segment.words
+                ]
+                stitched.append(dataclasses.replace(
+                    segment, id=len(stitched) + 1, start=start, end=end, words=words
+                ))
+        
+        logger.info(f"Parallel transcription: {len(chunks)} chunks → {len(stitched)} segments")
+        info = dataclasses.replace(results[0][3], duration=len(audio) / SAMPLE_RATE)
+        return stitched, info
+
+    def _transcribe_streamed(
+        self,
+        audio_path: str,
+        language: Optional[str],
+        transcribe_kwargs: Dict[str, Any]
+    ) -> Tuple[Any, Any]:
+        """
+        Transcribe a file too long to decode in memory, one block at a time.
+        
+        Blocks of STREAM_BLOCK_SECONDS are read with soundfile.blocks, each
+        starting CHUNK_OVERLAP_SECONDS early, brought to 16kHz mono and decoded
+        in turn, so only one block of samples is held at once. Segment times are
+        shifted by the block's offset and segments centred in a block's leading
+        overlap are dropped, as in _transcribe_chunked.
+        
+        Args:
+            audio_path: Path to a WAV/FLAC/OGG file
+            language: Language code, or None to detect it on the first block
+            transcribe_kwargs: Extra arguments for ModelManager.transcribe
+            
+        Returns:
+            Tuple of (segments, info) like ModelManager.transcribe: segments is a
+            lazy generator and info.duration covers the whole file
+        """
+        file_info = soundfile.info(audio_path)
+        sample_rate = file_info.samplerate
+        block_frames = int(STREAM_BLOCK_SECONDS * sample_rate)
+        overlap_frames = int(CHUNK_OVERLAP_SECONDS * sample_rate)
+        blocks = soundfile.blocks(
+            audio_path, blocksize=block_frames, overlap=overlap_frames,
+            dtype='float32', always_2d=True
+        )
+        # Context from a previous file only applies to the opening block
+        block_kwargs = {k: v for k, v in transcribe_kwargs.items() if k != 'initial_prompt'}
+        
+        # Decode the first block now: its info carries the detected language
+        first_segments, first_info = self.model_manager.transcribe(
+            _to_model_rate(next(blocks), sample_rate),
+            language=language,
+            task="transcribe",
+            **transcribe_kwargs
+        )
+        language = first_info.language
+        
+        def stream():
+            segment_id = 0
+            block_segments = first_segments
+            index = 0
+            while True:
+                offset = index * (block_frames - overlap_frames) / sample_rate
+                boundary = offset + (CHUNK_OVERLAP_SECONDS if index else 0.0)
+                for segment in block_segments:
+                    start, end = segment.start + offset, segment.end + offset
+                    if (start + end) / 2 < boundary:
+                        continue
+                    segment_id += 1
+                    words = segment.words and [
+                        dataclasses.replace(word, start=word.start + offset, end=word.end + offset)
+                        for word in segment.words
+                    ]
+                    yield dataclasses.replace(segment, id=segment_id, start=start, end=end, words=words)
+                
+                block = next(blocks, None)
+                if block is None:
+                    return
+                index += 1
+                block_segments, _ = self.model_manager.transcribe(
+                    _to_model_rate(block, sample_rate),
+                    language=language,
+                    task="transcribe",
+                    **block_kwargs
+                )
+        
+        logger.info(f"Streaming transcription in {STREAM_BLOCK_SECONDS}s blocks "
+                   f"({file_info.duration:.0f}s of audio)")
+        return stream(), dataclasses.replace(first_info, duration=file_info.duration)
+
     def _merge_segments_adaptive(
         self, 
         segments: List[Dict[str, Any]], 
@@ -197,6 +703,10 @@ class AudioTranscriber:
         """
         Intelligently merge segments using adaptive thresholds.
         
+        Merge decisions are made for all adjacent pairs at once; each run of
+        merged segments becomes one segment spanning the run, with its texts
+        joined and a duration-weighted mean confidence.
+        
         Args:
             segments: List of segment dictionaries
             analysis: Segment analysis results with adaptive parameters
@@ -207,41 +717,37 @@ class AudioTranscriber:
         if not segments or len(segments) <= 1:
             return segments
         
-        merged = []
-        current = segments[0].copy()
+        # Structure-of-arrays view of the segments, built in one pass each
+        count = len(segments)
+        starts = np.fromiter((seg['start'] for seg in segments), dtype=np.float64, count=count)
+        ends = np.fromiter((seg['end'] for seg in segments), dtype=np.float64, count=count)
+        confs = np.fromiter((seg.get('confidence', -1.0) for seg in segments), dtype=np.float64, count=count)
+        has_conf = np.fromiter(('confidence' in seg for seg in segments), dtype=bool, count=count)
         
-        for i in range(1, len(segments)):
-            next_seg = segments[i]
-            
-            # Get merge decision
-            should_merge, reason = self.segment_analyzer.should_merge_segments(
-                current, next_seg, analysis
-            )
-            
-            if should_merge:
-                # Merge segments
-                current['end'] = next_seg['end']
-                current['text'] = current['text'] + ' ' + next_seg['text']
-                
-                # Weighted confidence average by duration
-                if 'confidence' in current and 'confidence' in next_seg:
-                    dur_current = current.get('_original_duration', current['end'] - current['start'])
-                    dur_next = next_seg.get('_original_duration', next_seg['end'] - next_seg['start'])
-                    total_dur = dur_current + dur_next
-                    
-                    weighted_conf = (
-                        (current['confidence'] * dur_current + next_seg['confidence'] * dur_next) 
-                        / total_dur
-                    )
-                    current['confidence'] = weighted_conf
-                
-                logger.debug(f"Merged segments: {reason}")
-            else:
-                # Save current and start new
-                merged.append(current)
-                current = next_seg.copy()
+        threshold = analysis.get('adaptive_threshold', 0.5)
         
-        merged.append(current)
+        # Numeric scan (numba-compiled when available): run boundaries and
+        # duration-weighted confidence sums per run
+        group_starts, weighted_conf, total_weight = merge_runs(starts, ends, confs, has_conf, threshold)
+        group_ends = np.append(group_starts[1:], count)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            for i in range(count - 1):
+                should_merge, reason = self.segment_analyzer.should_merge_segments(
+                    segments[i], segments[i + 1], analysis, want_reason=True
+                )
+                if should_merge:
+                    logger.debug(f"Merged segments: {reason}")
+        
+        merged = []
+        for g, (lo, hi) in enumerate(zip(group_starts.tolist(), group_ends.tolist())):
+            current = segments[lo].copy()
+            if hi - lo > 1:
+                current['end'] = segments[hi - 1]['end']
+                current['text'] = ' '.join(seg['text'] for seg in segments[lo:hi])
+                if 'confidence' in current and total_weight[g] > 0:
+                    current['confidence'] = float(weighted_conf[g] / total_weight[g])
+            merged.append(current)
         
         logger.info(f"Segment merging: {len(segments)} → {len(merged)} segments "
                    f"({(1 - len(merged)/len(segments))*100:.1f}% reduction)")
@@ -258,27 +764,36 @@ class AudioTranscriber:
         analysis = self.segment_analyzer.analyze_segments(segments)
         return self._merge_segments_adaptive(segments, analysis)
 
-    def _calculate_quality_metrics(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_quality_metrics(
+        self,
+        segments: List[Dict[str, Any]],
+        metrics: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Calculate quality metrics for transcribed segments.
         Delegates to QualityMetricsCalculator for consistency.
         
         Args:
             segments: List of segment dictionaries with confidence scores
+            metrics: Metrics already calculated for these segments (e.g. the
+                'quality_metrics' of transcribe_file's result); skips the
+                segment pass entirely
             
         Returns:
             Dictionary with quality metrics (backward compatible format)
         """
-        metrics = self.quality_metrics_calculator.calculate_metrics(segments)
+        if metrics is None:
+            metrics = self.quality_metrics_calculator.calculate_metrics(
+                segments, low_confidence_threshold=self.segment_merge_threshold
+            )
         
         # Return backward-compatible format
-        confidences = [seg.get('confidence', 0.0) for seg in segments if 'confidence' in seg]
         return {
             "avg_confidence": metrics['confidence_simple_avg'],
-            "low_confidence_count": sum(1 for c in confidences if c < self.segment_merge_threshold),
+            "low_confidence_count": metrics['low_confidence_count'],
             "total_segments": metrics['segment_count'],
-            "min_confidence": min(confidences) if confidences else 0.0,
-            "max_confidence": max(confidences) if confidences else 0.0,
+            "min_confidence": metrics['confidence_min'],
+            "max_confidence": metrics['confidence_max'],
             # Add new metrics
             "quality_tier": metrics['quality_tier'],
             "degradation_detected": metrics['degradation_detected'],
@@ -286,8 +801,35 @@ class AudioTranscriber:
         }
 
 
+    def _save_markdown(self, transcription_data: Dict[str, Any]) -> Path:
+        """Render transcription data to markdown and atomically write it to the transcription folder."""
+        # Kept as parts: the transcript is never concatenated into one document
+        # string before being encoded
+        parts = markdown_parts(**transcription_data)
+        TRANSCRIPTION_FOLDER.mkdir(parents=True, exist_ok=True)
+        
+        output_path = TRANSCRIPTION_FOLDER / f"{transcription_data['filename']}.md"
+        
+        # Atomic write
+        temp_path = output_path.with_suffix('.tmp')
+        encoding = OUTPUT_ENCODING if ENSURE_UTF8_ENCODING else "utf-8"
+        # Encode each chunk ourselves and write bytes: skips the TextIOWrapper
+        # layer while still never holding a full encoded copy of the transcript
+        with temp_path.open('wb') as f:
+            for part in parts:
+                for i in range(0, len(part), WRITE_CHUNK_CHARS):
+                    f.write(part[i:i + WRITE_CHUNK_CHARS].encode(encoding))
+            # Data must be on disk before the rename, or a crash can leave an
+            # empty transcript in place of the old one
+            f.flush()
+            os.fsync(f.fileno())
+        temp_path.replace(output_path)
+        return output_path
+
     def transcribe_file(self, audio_path: str, progress_callback: Optional[Callable[[str], None]] = None, 
-                       formatting_style: str = "auto", language: Optional[str] = None) -> tuple[Path, Dict[str, Any]]:
+                       formatting_style: str = "auto", language: Optional[str] = None,
+                       initial_prompt: Optional[str] = None,
+                       preloaded_audio: Optional[np.ndarray] = None) -> tuple[Path, Dict[str, Any]]:
         """
         Transcribe audio file using the shared ModelManager instance.
         
@@ -296,15 +838,26 @@ class AudioTranscriber:
             progress_callback: Optional callback for progress updates.
             formatting_style: Formatting style for the output markdown.
             language: Language code to force transcription in specific language.
+            initial_prompt: Optional text preceding this audio (e.g. the tail of the
+                previous file in a split recording). When given, the decoder is
+                primed with it and a narrower beam is used.
+            preloaded_audio: Optional audio already decoded by _preprocess_audio
+                (e.g. prefetched by the batch processor); skips decoding here.
             
         Returns:
             Tuple containing the path to the generated markdown file and the transcription data dictionary.
         """
         start_time = datetime.now()
         
+        # Parse the path once; stem names both the note and the output file
+        audio = Path(audio_path)
+        stem = audio.stem
+        
         try:
-            self.validate_audio_file(audio_path)
-            metadata = self.get_audio_metadata(audio_path)
+            st = self.validate_audio_file(audio)
+            # Duration comes from the decoder below; probing it here would open
+            # (and for some formats decode) the file a second time
+            metadata = self.get_audio_metadata(audio, stat=st, include_duration=False)
             
             if progress_callback:
                 progress_callback("Initializing transcription...")
@@ -318,90 +871,173 @@ class AudioTranscriber:
             elif self.language and self.language != 'auto':
                 transcription_language = self.language
             
+            # Serve identical audio from the transcript cache (context-primed runs are not cached)
+            cache_key = None
+            if self.transcript_cache is not None and not initial_prompt:
+                try:
+                    cache_key = self.transcript_cache.make_key(
+                        audio_path, self.model_size, transcription_language,
+                        settings=self._cache_settings()
+                    )
+                    cached_data = self.transcript_cache.get(cache_key)
+                except Exception as e:
+                    logger.debug(f"Transcript cache lookup failed: {e}")
+                    cached_data = None
+                
+                if cached_data is not None:
+                    now = datetime.now()
+                    cached_data.update({
+                        'filename': stem,
+                        'date': now.strftime("%Y-%m-%d %H:%M:%S"),
+                        'formatting_style': formatting_style,
+                        'processing_time_seconds': (now - start_time).total_seconds()
+                    })
+                    output_path = self._save_markdown(cached_data)
+                    if progress_callback:
+                        progress_callback("✓ Transcription loaded from cache!")
+                    logger.info(f"Transcript cache hit: {metadata['filename']}")
+                    return output_path, cached_data
+            
             # Preprocess audio if enabled (for better quality)
-            preprocessed_audio = self._preprocess_audio(audio_path)
+            if preloaded_audio is not None:
+                preprocessed_audio = preloaded_audio
+            else:
+                preprocessed_audio = self._preprocess_audio(audio_path)
             audio_input = preprocessed_audio if preprocessed_audio is not None else str(audio_path)
             
             # Transcribe with optimized parameters
-            # Use preprocessed audio if available, otherwise use file path
-            segments, info = self.model_manager.transcribe(
-                audio_input,
-                beam_size=self.beam_size,
-                language=transcription_language,
-                task="transcribe"
-            )
+            transcribe_kwargs = {'beam_size': self.beam_size, **self.decode_overrides}
+            if initial_prompt:
+                # Prior context already constrains decoding, so a narrow beam suffices
+                transcribe_kwargs['initial_prompt'] = initial_prompt
+                transcribe_kwargs['beam_size'] = min(self.beam_size, 2)
+                transcribe_kwargs['patience'] = 1.0
+            
+            segments = None
+            # Context-primed runs need faster-whisper's initial_prompt support
+            if self._hf_pipe is not None and not initial_prompt:
+                try:
+                    segments, info = hf_backend.transcribe(
+                        self._hf_pipe, audio_input, transcription_language, self.hf_batch_size
+                    )
+                except Exception as e:
+                    logger.warning(f"Transformers backend failed, falling back to faster-whisper: {e}")
+            
+            if segments is None and (self.enable_parallel_segment_processing
+                    and isinstance(audio_input, np.ndarray)
+                    and len(audio_input) > self.parallel_chunk_seconds * SAMPLE_RATE):
+                # Long audio: decode overlapping chunks concurrently
+                segments, info = self._transcribe_chunked(
+                    audio_input, transcription_language, transcribe_kwargs
+                )
+            elif segments is None and isinstance(audio_input, str) and _exceeds_decode_limit(audio_input):
+                # Too long to decode in memory: stream it to the model in blocks
+                segments, info = self._transcribe_streamed(
+                    audio_input, transcription_language, transcribe_kwargs
+                )
+            elif segments is None:
+                # Use preprocessed audio if available, otherwise use file path
+                segments, info = self.model_manager.transcribe(
+                    audio_input,
+                    language=transcription_language,
+                    task="transcribe",
+                    **transcribe_kwargs
+                )
             
             if progress_callback:
                 progress_callback(f"Detected language: {info.language} (probability: {info.language_probability:.2f})")
             
+            metadata['duration_seconds'] = info.duration
+            metadata['duration_formatted'] = _format_duration(info.duration)
+            
             # Process segments with optimizations
             total_duration = info.duration
-            last_progress_percent = -1
+            # Segment end time (seconds) at which the next progress update is due,
+            # i.e. once progress advances by progress_update_frequency percent
+            report_progress = progress_callback is not None and total_duration > 0
+            next_progress_end = (self.progress_update_frequency - 1) * total_duration / 100
             
-            # Pre-allocate list capacity estimate for better performance
-            estimated_segments = int(total_duration / 3) if total_duration > 0 else 100
             transcribed_segments = []
-            text_parts = []
+            append_segment = transcribed_segments.append
+            
+            # Bind settings to locals once. With filtering disabled the minimum
+            # duration is -inf, so the filter check never passes its first test
+            min_duration = self.min_segment_duration if self.enable_segment_filtering else float('-inf')
+            confidence_floor = self.segment_merge_threshold
+            update_frequency = self.progress_update_frequency
+            log_filtered = logger.isEnabledFor(logging.DEBUG)
             
             # Process segments with optimized loop
-            segment_count = 0
             for segment in segments:
-                segment_count += 1
+                avg_logprob = getattr(segment, 'avg_logprob', None)
+                
                 # Smart segment filtering: skip very short, low-confidence segments
                 segment_duration = segment.end - segment.start
-                if self.enable_segment_filtering:
-                    if segment_duration < self.min_segment_duration:
-                        if hasattr(segment, 'avg_logprob') and segment.avg_logprob < self.segment_merge_threshold:
-                            logger.debug(f"Filtered micro-segment: {segment_duration:.2f}s, confidence: {segment.avg_logprob:.2f}")
-                            continue
-                
-                # Store segment data (optimized dict creation)
-                segment_data = {
-                    "id": segment.id,
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip()  # Strip whitespace immediately
-                }
+                if segment_duration < min_duration:
+                    if avg_logprob is not None and avg_logprob < confidence_floor:
+                        if log_filtered:
+                            logger.debug(f"Filtered micro-segment: {segment_duration:.2f}s, confidence: {avg_logprob:.2f}")
+                        continue
                 
-                # Add confidence if available
-                if hasattr(segment, 'avg_logprob'):
-                    segment_data["confidence"] = float(segment.avg_logprob)
+                # Store segment data as a plain dict: merging updates it in place and
+                # the transcript cache serializes it as JSON. Built in one literal so
+                # the dict is sized once instead of growing for the confidence key
+                if avg_logprob is not None:
+                    segment_data = {
+                        "id": segment.id,
+                        "start": segment.start,
+                        "end": segment.end,
+                        "text": segment.text.strip(),  # Strip whitespace immediately
+                        "confidence": float(avg_logprob)
+                    }
+                else:
+                    segment_data = {
+                        "id": segment.id,
+                        "start": segment.start,
+                        "end": segment.end,
+                        "text": segment.text.strip()
+                    }
                 
-                transcribed_segments.append(segment_data)
-                # Use pre-stripped text for efficiency
-                text_parts.append(segment_data["text"])
+                append_segment(segment_data)
                 
-                # Optimized progress updates: only update on significant changes
-                if progress_callback and total_duration > 0:
+                # Optimized progress updates: one float comparison per segment
+                if report_progress and segment.end >= next_progress_end:
                     current_percent = int((segment.end / total_duration) * 100)
-                    # Update only if percent changed by at least progress_update_frequency
-                    if current_percent - last_progress_percent >= self.progress_update_frequency:
-                        progress_callback(f"Transcribing: {current_percent}% ({int(segment.end)}s/{int(total_duration)}s)")
-                        last_progress_percent = current_percent
+                    progress_callback(f"Transcribing: {current_percent}% ({int(segment.end)}s/{int(total_duration)}s)")
+                    next_progress_end = (current_percent + update_frequency) * total_duration / 100
             
-            # Efficient text assembly using join with space separator (O(n) vs O(n²) concatenation)
-            final_text = " ".join(text_parts).strip()
+            # Assemble text from the segment dicts (already stripped) in one join;
+            # no parallel list of text parts is kept during decoding
+            final_text = " ".join([seg["text"] for seg in transcribed_segments]).strip()
             
             # Prepare result data
             now = datetime.now()
             processing_time = (now - start_time).total_seconds()
             
-            # Apply adaptive segment merging for better quality
-            analysis = self.segment_analyzer.analyze_segments(transcribed_segments)
-            logger.info(f"Segment analysis: {analysis['analysis_quality']} quality, "
-                       f"adaptive_threshold={analysis['adaptive_threshold']:.3f}s, "
-                       f"speech_rate={analysis['speech_rate']:.2f} wps")
-            
-            transcribed_segments = self._merge_segments_adaptive(
-                transcribed_segments, 
-                analysis
-            )
+            # Apply adaptive segment merging for better quality; short clips have
+            # too few segments for the analysis to pay off
+            segment_count = len(transcribed_segments)
+            if segment_count >= self.min_segments_for_merge:
+                analysis = self.segment_analyzer.analyze_segments(transcribed_segments)
+                logger.info(f"Segment analysis: {analysis['analysis_quality']} quality, "
+                           f"adaptive_threshold={analysis['adaptive_threshold']:.3f}s, "
+                           f"speech_rate={analysis['speech_rate']:.2f} wps")
+                
+                transcribed_segments = self._merge_segments_adaptive(
+                    transcribed_segments, 
+                    analysis
+                )
+            else:
+                logger.debug(f"Skipping segment merging: {segment_count} segments "
+                            f"(< {self.min_segments_for_merge})")
             
             # Calculate quality metrics using QualityMetricsCalculator
-            quality_metrics = self.quality_metrics_calculator.calculate_metrics(transcribed_segments)
+            quality_metrics = self.quality_metrics_calculator.calculate_metrics(
+                transcribed_segments, low_confidence_threshold=self.segment_merge_threshold
+            )
             
             transcription_data = {
-                'filename': Path(audio_path).stem,
+                'filename': stem,
                 'text': final_text,
                 'date': now.strftime("%Y-%m-%d %H:%M:%S"),
                 'duration': metadata['duration_formatted'],
@@ -416,19 +1052,10 @@ class AudioTranscriber:
                 'quality_metrics': quality_metrics
             }
             
-            # Save to Markdown
-            markdown_text = create_markdown(**transcription_data)
-            TRANSCRIPTION_FOLDER.mkdir(parents=True, exist_ok=True)
-            
-            output_path = TRANSCRIPTION_FOLDER / f"{Path(audio_path).stem}.md"
+            output_path = self._save_markdown(transcription_data)
             
-            # Atomic write
-            temp_path = output_path.with_suffix('.tmp')
-            encoding = OUTPUT_ENCODING if ENSURE_UTF8_ENCODING else "utf-8"
-            temp_path.write_text(markdown_text, encoding=encoding)
-            if output_path.exists():
-                output_path.unlink()
-            temp_path.rename(output_path)
+            if cache_key is not None:
+                self.transcript_cache.put(cache_key, transcription_data)
             
             if progress_callback:
                 progress_callback("✓ Transcription completed!")
@@ -0,0 +1,115 @@
+"""
+Transcript Cache Module
+Content-addressed cache of transcription results across runs
+"""
+
+import json
+import hashlib
+import logging
+import mmap
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Hash input in 4 MiB blocks so large files never sit in memory at once
+_HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class TranscriptCache:
+    """
+    Caches transcription data keyed by audio content, model and language.
+    Re-transcribing identical audio becomes a hash plus a JSON read.
+    Least-recently-used entries are evicted once max_entries is exceeded.
+    """
+
+    def __init__(self, cache_dir: Path = Path('.transcript_cache'), max_entries: int = 500):
+        """
+        Initialize transcript cache.
+
+        Args:
+            cache_dir: Directory to store cached transcription data
+            max_entries: Maximum number of cached transcripts to keep
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(
+        self,
+        audio_path: str,
+        model_size: str,
+        language: Optional[str],
+        settings: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build a cache key from the audio content hash, model and language.
+
+        Args:
+            audio_path: Audio file to hash (BLAKE3 when installed, else BLAKE2b)
+            model_size: Model name
+            language: Language code, or None for auto-detection
+            settings: Other decoding settings that change the output (beam size,
+                backend, ...); a change in any of them yields a new key
+        """
+        hasher = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b(digest_size=20)
+        with open(audio_path, 'rb') as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for offset in range(0, len(mm), _HASH_CHUNK_SIZE):
+                        hasher.update(mm[offset:offset + _HASH_CHUNK_SIZE])
+            except ValueError:
+                # Empty files cannot be memory-mapped
+                pass
+        key = f"{hasher.hexdigest()}_{model_size}_{language or 'auto'}"
+        if settings:
+            settings_hash = hashlib.blake2b(repr(sorted(settings.items())).encode('utf-8'), digest_size=4)
+            key = f"{key}_{settings_hash.hexdigest()}"
+        return key
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached transcription data for key, or None on miss."""
+        entry = self.cache_dir / f"{key}.json"
+        try:
+            with open(entry, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {entry.name}: {e}")
+            entry.unlink(missing_ok=True)
+            return None
+
+        # Refresh mtime so eviction treats this entry as recently used
+        entry.touch()
+        return data
+
+    def put(self, key: str, transcription_data: Dict[str, Any]):
+        """Store transcription data under key and evict old entries."""
+        entry = self.cache_dir / f"{key}.json"
+        temp_path = entry.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(transcription_data, f, ensure_ascii=False)
+            temp_path.replace(entry)
+            self._evict()
+        except Exception as e:
+            logger.warning(f"Could not write transcript cache entry: {e}")
+
+    def _evict(self):
+        """Remove least-recently-used entries beyond max_entries."""
+        entries = list(self.cache_dir.glob('*.json'))
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for entry in entries[:excess]:
+            entry.unlink(missing_ok=True)
+        logger.debug(f"Evicted {excess} transcript cache entries")